@@ -2,24 +2,43 @@
 from langdetect import detect
 import sys
 import os
-import re
-from textblob import TextBlob
+import signal
+import hmac
 
 
 # Add project root (parent of app/) to Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from flask import Flask, request, jsonify
-from utils.news_utils import extract_article, translate_to_english, analyze_bias,sentence_tone_breakdown, get_source_reliability_score
+from utils.news_utils import extract_article, translate_to_english, analyze_article, get_source_reliability_score, inference_stats, preload_model, model_status, pin_model, swap_model, swap_on_signal, shadow_summary, available_models, find_entities, check_bias_options
 
 
 app = Flask(__name__)
 
+# Model preloading: "background" (default), "blocking" (warm before serving) or "off" (load on first request)
+PRELOAD = os.getenv("INSIGHTLENS_PRELOAD", "background")
+DEBUG = os.getenv("FLASK_DEBUG", "1") == "1"
+# Required as X-Admin-Token on /admin routes; without it they are disabled (behind a proxy every client is localhost)
+ADMIN_TOKEN = os.getenv("INSIGHTLENS_ADMIN_TOKEN", "")
+SWAP_SIGNAL = os.getenv("INSIGHTLENS_SWAP_SIGNAL", "1") == "1"
+PREFORK = os.getenv("INSIGHTLENS_PREFORK", "0") == "1"  # set by app/serve.py: the parent owns the model
+
 @app.route("/analyze", methods=["POST"])
 def analyze():
     try:
         data = request.get_json()
-        
+
+        # 🧠 "model": "fast" for bulk triage, "accurate" (default) for the dashboard
+        model_choice = data.get("model")
+        if model_choice and model_choice not in available_models():
+            return jsonify({"error": f"Model not available: {model_choice}", "available": available_models()}), 400
+
+        # ⚖️ Reject an unknown bias mode or a weighting the mode does not use before fetching anything
+        try:
+            check_bias_options(data.get("bias_mode"), data.get("bias_weighting"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         # 📝 Check if manual input
         if data.get("manual"):
             text = data.get("text", "")
@@ -27,12 +46,6 @@ def analyze():
             if not text.strip():
                 return jsonify({"error": "No text provided."}), 400
             lang = detect(text)
-            if text and lang != "en":
-                translated_text = translate_to_english(text, lang)
-            else:
-                translated_text = text or "No text available for translation."
-            bias_data = analyze_bias(translated_text)
-            political_scores = detect_political_leaning(translated_text)
         else:
             # 🔗 Handle normal URL flow
             url = data.get("url")
@@ -46,10 +59,25 @@ def analyze():
             text = article_data["text"]
             title = article_data["title"]
             lang = article_data["language"]
-            translated_text = translate_to_english(text, lang)
 
-        bias_data = analyze_bias(translated_text)
-        political_scores = detect_political_leaning(translated_text)
+        # 🏷️ Party mentions straight from the original-language text; "entities_only" skips translation and the model
+        entities = find_entities(text)
+        if data.get("entities_only"):
+            return jsonify({"title": title, "language": lang, "entities": entities})
+        translated_text = translate_to_english(text, lang)
+
+        # One tokenizer pass feeds the article-level bias, the sentence breakdown and the party leaning;
+        # the whole request stays on one model version even if a hot swap lands meanwhile
+        with pin_model(model_choice) as loaded:
+            bias_data, tone_data, political_scores, aspect_scores = analyze_article(
+                translated_text,
+                cascade=data.get("cascade"),
+                weighting=data.get("bias_weighting"),
+                bias_mode=data.get("bias_mode"),
+                sample=data.get("sample"),
+                columnar=(request.args.get("format") or data.get("format")) == "columnar",
+                aspects=data.get("aspects"),
+            )
         url = data.get("url")  # safely get it (could be None)
 
         if url:
@@ -57,8 +85,6 @@ def analyze():
         else:
             score_info = {"score": "N/A", "label": "N/A"}  # fallback for manual mode
 
-        tone_data = sentence_tone_breakdown(translated_text)
-
         return jsonify({
             "title": title,
             "language": lang,
@@ -68,39 +94,81 @@ def analyze():
             "tone_breakdown": tone_data,
             "source_reliability": score_info,
             "political_leaning": political_scores,
+            "aspect_leaning": aspect_scores,
+            "entities": entities,
+            "model_version": loaded.version,
         })
 
     except Exception as e:
         print("Error in /analyze:", e)
         return jsonify({"error": f"Request failed: {str(e)}"}), 500
 
-def detect_political_leaning(text):
-    """
-    Detect sentiment polarity toward political parties/entities.
-    """
-    parties = {
-        "BJP": ["BJP", "Modi", "NDA", "RSS"],
-        "Congress": ["Congress", "Rahul Gandhi", "UPA"],
-        "AAP": ["Aam Aadmi Party", "AAP", "Arvind Kejriwal"]
-    }
-
-    results = {}
-    for party, keywords in parties.items():
-        matched_sentences = []
-        for keyword in keywords:
-            matches = re.findall(rf"([^.]*\b{keyword}\b[^.]*)", text, re.IGNORECASE)
-            matched_sentences.extend(matches)
-
-        if matched_sentences:
-            avg_polarity = sum(TextBlob(sentence).sentiment.polarity for sentence in matched_sentences) / len(matched_sentences)
-            results[party] = round(avg_polarity, 3)
-
-    return results
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    # 💓 Liveness: the process is up, whatever the model is doing
+    return jsonify({"status": "ok", "model": model_status()})
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    # 🚦 Readiness: only route traffic here once the model is loaded and warm
+    status = model_status()
+    return jsonify(status), (200 if status["ready"] else 503)
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    # 📈 Inference scheduler queue depth and batch-size histograms
+    return jsonify(inference_stats())
+
+@app.route("/shadow", methods=["GET"])
+def shadow():
+    # 👥 Candidate vs primary model on sampled live sentences (scored in the background)
+    return jsonify(shadow_summary())
+
+@app.route("/admin/model", methods=["GET", "POST"])
+def admin_model():
+    # 🔁 Zero-downtime model swap: POST {"model": "<name or path>", "entry": "<registry name>"}
+    # (empty body reloads the default model)
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Admin routes are disabled: set INSIGHTLENS_ADMIN_TOKEN"}), 403
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+
+    if request.method == "GET":
+        return jsonify(model_status())
+    try:
+        data = request.get_json(silent=True) or {}
+        if PREFORK:
+            # Swapping here would only change this worker: the parent reloads and re-forks them all
+            if data.get("model") or data.get("entry"):
+                return jsonify({"error": "Under app/serve.py only the current model can be reloaded (empty body); "
+                                         "restart the server to change it"}), 409
+            os.kill(os.getppid(), signal.SIGHUP)
+            return jsonify({"reload": "requested", "parent": os.getppid()}), 202
+        return jsonify(swap_model(data.get("model"), data.get("entry"))), 202
+    except (RuntimeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 409
+
+def install_swap_signal():
+    # `kill -HUP <pid>` reloads the current model without a restart (not in the pre-fork parent, see app/serve.py)
+    if not SWAP_SIGNAL:
+        return
+    try:
+        signal.signal(signal.SIGHUP, swap_on_signal)
+    except (AttributeError, ValueError):
+        pass  # no SIGHUP on this platform, or not imported on the main thread
 
 
 
 
 # 🔥 This line is critical — without it, nothing will run
 if __name__ == "__main__":
+    # The debug reloader runs this file twice; only the serving child should load the model
+    if not DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        preload_model(PRELOAD)
+        install_swap_signal()
     print("Flask server starting...")
-    app.run(debug=True)
+    app.run(debug=DEBUG)
+else:
+    # Imported by a WSGI server (or a script): start warming up while workers boot
+    preload_model(PRELOAD)
+    install_swap_signal()
@@ -0,0 +1,181 @@
+# app/serve.py
+"""
+Pre-fork server for the Flask API.
+
+The model is loaded and warmed once in the parent, frozen, and then N
+workers are forked. The workers share the weight pages copy-on-write, so
+adding a worker costs its own interpreter state, not another copy of
+RoBERTa. Each worker gets cores // workers torch intra-op threads.
+
+`kill -HUP <parent>` (or an empty `POST /admin/model` to any worker)
+reloads the model in the parent - load, warm, freeze - and then replaces
+the workers one at a time with fresh forks, so they keep sharing one copy.
+
+    python app/serve.py --workers 4 --port 5000
+
+Linux/macOS only (needs os.fork).
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+import torch
+from werkzeug.serving import make_server
+
+# Add project root (parent of app/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+os.environ.setdefault("INSIGHTLENS_PRELOAD", "off")  # the parent preloads explicitly below
+os.environ["INSIGHTLENS_SWAP_SIGNAL"] = "0"  # only the parent reloads, see reload_model()
+os.environ["INSIGHTLENS_PREFORK"] = "1"  # /admin/model signals the parent instead of swapping one worker
+
+from app.main import app
+from utils.news_utils import get_model, preload_model, model_status, swap_model
+
+
+def freeze_model():
+    """Put the model in inference mode and move every live object out of the GC's reach."""
+    gc.unfreeze()  # after a reload, let the old model's objects be collected first
+    model = get_model().model
+    model.eval()
+    for param in model.parameters():
+        param.requires_grad_(False)
+    torch.set_grad_enabled(False)
+
+    # Collecting after fork would touch (and so copy) every tracked object page;
+    # gc.freeze() parks them in a permanent generation the workers never scan.
+    gc.collect()
+    gc.freeze()
+
+
+def reload_model():
+    """Reload the current model in the parent and freeze it again; True once the new one is ready."""
+    try:
+        swap_model(background=False)
+    except Exception as e:
+        print(f"Model reload on SIGHUP failed: {e}", flush=True)
+        return False
+    swap = model_status()["swap"]
+    if swap["state"] != "done":
+        print(f"Model reload on SIGHUP failed: {swap['error']}", flush=True)
+        return False
+    freeze_model()
+    return True
+
+
+def threads_per_worker(workers):
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def run_worker(sock, threads):
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already fixed in the parent
+
+    server = make_server(sock.getsockname()[0], sock.getsockname()[1], app, threaded=True, fd=sock.fileno())
+    # SIGTERM: stop accepting, let in-flight requests finish, then exit (see spawn)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    # The model is only ever reloaded in the parent
+    signal.signal(signal.SIGHUP, lambda *_: os.kill(os.getppid(), signal.SIGHUP))
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    server.serve_forever()
+    for thread in threading.enumerate():
+        if "process_request_thread" in thread.name:
+            thread.join(timeout=30)
+
+
+def spawn(sock, threads):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(sock, threads)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("INSIGHTLENS_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("INSIGHTLENS_PORT", "5000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("INSIGHTLENS_WORKERS", str(os.cpu_count() or 1))))
+    parser.add_argument("--threads", type=int, default=None, help="torch threads per worker (default: cores // workers)")
+    args = parser.parse_args()
+
+    threads = args.threads or threads_per_worker(args.workers)
+
+    preload_model("blocking")
+    if not model_status()["ready"]:
+        sys.exit(f"Model failed to load: {model_status()['error']}")
+    freeze_model()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    workers = {spawn(sock, threads) for _ in range(args.workers)}
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} workers x {threads} torch threads "
+          f"(parent pid {os.getpid()})", flush=True)
+
+    stopping = False
+    reloading = False
+
+    def terminate(pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            terminate(pid)
+
+    def request_reload(*_):
+        nonlocal reloading
+        reloading = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, request_reload)  # `kill -HUP <parent>` reloads the model for every worker
+
+    while workers:
+        if reloading and not stopping:
+            reloading = False
+            if reload_model():
+                # One at a time: the new fork is serving before the old worker drains and exits
+                for pid in list(workers):
+                    workers.add(spawn(sock, threads))
+                    workers.discard(pid)
+                    terminate(pid)
+                    try:
+                        os.waitpid(pid, 0)
+                    except ChildProcessError:
+                        pass
+                print(f"Reloaded {model_status()['version']}", flush=True)
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            time.sleep(0.5)  # a signal cuts this short
+            continue
+        workers.discard(pid)
+        if not stopping:
+            # Replace a crashed worker; it shares the parent's current frozen weights
+            time.sleep(0.5)
+            workers.add(spawn(sock, threads))
+
+
+if __name__ == "__main__":
+    main()
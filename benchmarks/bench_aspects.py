@@ -0,0 +1,66 @@
+# benchmarks/bench_aspects.py
+"""
+Party leaning from aspect windows versus whole sentences as an article
+grows without more party mentions: the fixture corpus plus paragraphs of
+mention-free filler. Reports sequences and tokens scored and the time
+each takes; the sentence cache is bypassed.
+
+    python benchmarks/bench_aspects.py --filler 0 100 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import news_utils
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+
+FILLER = (
+    "Officials in district {i} said the monsoon arrived on schedule and reservoir levels were above "
+    "the ten-year average, while traffic on the arterial roads remained slow through the evening."
+)
+
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filler", type=int, nargs="+", default=[0, 100, 1000],
+                        help="mention-free sentences added to the corpus")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = " ".join(line.strip() for line in f if line.strip())
+    news_utils.sentence_cache = None
+    tokenizer = news_utils.get_model().tokenizer
+    matcher = news_utils.gazetteer.matcher()
+
+    print(f"{'filler':>7}{'mentions':>10}{'sent seqs':>11}{'sent toks':>11}{'sent ms':>9}"
+          f"{'win seqs':>10}{'win toks':>10}{'win ms':>8}")
+    for filler in args.filler:
+        text = corpus + " " + " ".join(FILLER.format(i=i) for i in range(filler))
+        sentences = [text[start:end] for start, end in news_utils.sentence_spans(text)]
+        sentence_tokens = sum(len(ids) for ids in tokenizer(sentences, truncation=True)["input_ids"])
+        _, sentence_ms = timed(lambda: news_utils.party_leaning(news_utils.score_sentences(text)), args.repeats)
+
+        windows, _ = news_utils.aspect_windows(text, matcher)
+        window_tokens = sum(len(window) + 2 for window in windows)
+        _, window_ms = timed(lambda: news_utils.aspect_leaning(text, matcher), args.repeats)
+        print(f"{filler:>7}{len(matcher.find(text)):>10}{len(sentences):>11}{sentence_tokens:>11}{sentence_ms:>9.1f}"
+              f"{len(windows):>10}{window_tokens:>10}{window_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
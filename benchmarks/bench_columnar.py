@@ -0,0 +1,63 @@
+# benchmarks/bench_columnar.py
+"""
+Post-processing cost and JSON size of the tone breakdown: one dict per
+sentence versus the columnar (parallel arrays) format. Uses random score
+rows, so no model is loaded.
+
+    python benchmarks/bench_columnar.py --sentences 100 1000 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.news_utils import format_tone_breakdown
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+
+
+def fake_scored(count, sentences, rng):
+    scores = rng.dirichlet(np.ones(3), size=count).astype(np.float32)
+    return {
+        "sentences": [sentences[i % len(sentences)] for i in range(count)],
+        "mentions": [["Bharatiya Janata Party"] if i % 4 == 0 else [] for i in range(count)],
+        "tiers": ["transformer"] * count,
+        "scores": scores,
+    }
+
+
+def timed(fn, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, float(np.median(timings)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    with open(CORPUS, encoding="utf-8") as f:
+        sentences = [line.strip() for line in f if line.strip()]
+    rng = np.random.default_rng(0)
+
+    print(f"{'sentences':>10}{'rows ms':>10}{'cols ms':>10}{'rows KB':>10}{'cols KB':>10}{'smaller':>9}")
+    for count in args.sentences:
+        scored = fake_scored(count, sentences, rng)
+        rows, rows_ms = timed(lambda: json.dumps(format_tone_breakdown(scored)))
+        cols, cols_ms = timed(lambda: json.dumps(format_tone_breakdown(scored, columnar=True)))
+        print(f"{count:>10}{rows_ms:>10.2f}{cols_ms:>10.2f}{len(rows) / 1024:>10.1f}{len(cols) / 1024:>10.1f}"
+              f"{1 - len(cols) / len(rows):>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
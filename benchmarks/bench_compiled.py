@@ -0,0 +1,64 @@
+# benchmarks/bench_compiled.py
+"""
+p50/p99 latency per padded sequence-length bucket: eager PyTorch versus
+the traced (or torch.compile'd) backend.
+
+    python benchmarks/bench_compiled.py --mode trace --batch-size 8 --iterations 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import news_utils
+from utils.backends import TorchBackend, CompiledTorchBackend
+
+
+def latencies(backend, input_ids, attention_mask, iterations):
+    backend.predict(input_ids, attention_mask)  # warm up / compile
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        backend.predict(input_ids, attention_mask)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 99) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["trace", "compile"], default="trace")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--buckets", type=int, nargs="+", default=news_utils.COMPILE_BUCKETS)
+    args = parser.parse_args()
+
+    loaded = news_utils.get_model()
+    eager = TorchBackend(loaded.model)
+    compiled = CompiledTorchBackend(loaded.model, loaded.name, news_utils.CACHE_DIR,
+                                    loaded.tokenizer.pad_token_id, args.mode, args.buckets, fingerprint=loaded.fingerprint)
+
+    rng = np.random.default_rng(0)
+    print(f"{'bucket':>7}{'eager p50':>11}{'eager p99':>11}{args.mode + ' p50':>12}{args.mode + ' p99':>12}{'speedup':>9}")
+    for bucket in args.buckets:
+        # Realistic batch: lengths spread over the bucket, so the compiled path pads up to it
+        lengths = rng.integers(max(bucket // 2, 2), bucket + 1, size=args.batch_size)
+        input_ids = np.full((args.batch_size, lengths.max()), loaded.tokenizer.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros_like(input_ids)
+        for row, length in enumerate(lengths):
+            input_ids[row, :length] = rng.integers(5, loaded.tokenizer.vocab_size, size=length)
+            attention_mask[row, :length] = 1
+
+        eager_p50, eager_p99 = latencies(eager, input_ids, attention_mask, args.iterations)
+        fast_p50, fast_p99 = latencies(compiled, input_ids, attention_mask, args.iterations)
+        print(f"{bucket:>7}{eager_p50:>11.2f}{eager_p99:>11.2f}{fast_p50:>12.2f}{fast_p99:>12.2f}{eager_p50 / fast_p50:>8.2f}x")
+
+    print("compiled backend:", compiled.status())
+
+
+if __name__ == "__main__":
+    main()
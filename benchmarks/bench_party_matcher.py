@@ -0,0 +1,100 @@
+# benchmarks/bench_party_matcher.py
+"""
+Party-mention detection cost as the alias list grows: the old loop (one
+re.search per sentence per alias), a flat precompiled alternation, and
+PartyMatcher's trie-shaped pattern. Synthetic parties are added to the
+party gazetteer to reach each alias count; no model is loaded.
+
+    python benchmarks/bench_party_matcher.py --aliases 60 500 2000 5000 --sentences 2000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.parties import PartyMatcher, load_gazetteer
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+
+
+def synthetic_parties(alias_count, rng):
+    parties = load_gazetteer()
+    have = sum(len(info.get("aliases", []) + info.get("leaders", [])) for info in parties.values())
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    i = 0
+    while have < alias_count:
+        aliases = ["".join(rng.choice(letters, size=rng.integers(5, 12))).capitalize() + f" {word}"
+                   for word in ("Party", "Morcha", "Leader", "Front")]
+        parties[f"Synthetic Party {i}"] = {"short": f"SP{i}", "aliases": aliases}
+        have += len(aliases)
+        i += 1
+    return parties
+
+
+def keyword_loop(parties, sentences):
+    all_mentions = []
+    for sentence in sentences:
+        mentions = []
+        for party, info in parties.items():
+            if any(re.search(rf"\b{re.escape(kw)}\b", sentence, re.IGNORECASE) for kw in info.get("aliases", []) + info.get("leaders", [])):
+                mentions.append(party)
+        all_mentions.append(mentions)
+    return all_mentions
+
+
+def flat_alternation(parties):
+    aliases = sorted({alias for info in parties.values() for alias in info.get("aliases", []) + info.get("leaders", [])},
+                     key=len, reverse=True)
+    return re.compile(rf"(?<!\w)(?:{'|'.join(map(re.escape, aliases))})(?!\w)", re.IGNORECASE)
+
+
+def timed(fn, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--aliases", type=int, nargs="+", default=[60, 500, 2000, 5000])
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--loop-limit", type=int, default=600,
+                        help="skip the per-alias loop above this many aliases (its cost is aliases x sentences)")
+    args = parser.parse_args()
+
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = [line.strip().rstrip(".") for line in f if line.strip()]
+    sentences = [corpus[i % len(corpus)] for i in range(args.sentences)]
+    text = ". ".join(sentences) + "."
+    spans, start = [], 0
+    for sentence in sentences:
+        spans.append((start, start + len(sentence)))
+        start += len(sentence) + 2
+    rng = np.random.default_rng(0)
+
+    print(f"{'aliases':>8}{'build ms':>10}{'loop ms':>10}{'flat ms':>10}{'trie ms':>10}{'mentions':>10}")
+    for alias_count in args.aliases:
+        parties = synthetic_parties(alias_count, rng)
+        matcher, build_ms = timed(lambda: PartyMatcher(parties), repeats=1)
+        total = len(matcher.alias_party)
+        mentions, trie_ms = timed(lambda: matcher.mentions(text, spans))
+        flat = flat_alternation(parties)
+        _, flat_ms = timed(lambda: sum(1 for _ in flat.finditer(text)))
+        loop_ms = float("nan")
+        if total <= args.loop_limit:
+            _, loop_ms = timed(lambda: keyword_loop(parties, sentences), repeats=1)
+        print(f"{total:>8}{build_ms:>10.1f}{loop_ms:>10.1f}{flat_ms:>10.1f}{trie_ms:>10.1f}"
+              f"{sum(map(len, mentions)):>10}")
+
+
+if __name__ == "__main__":
+    main()
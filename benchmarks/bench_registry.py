@@ -0,0 +1,90 @@
+# benchmarks/bench_registry.py
+"""
+Throughput, article latency and memory of every model in the registry, plus
+label agreement with the default model on the labelled fixture sentences.
+
+    python benchmarks/bench_registry.py --repeats 3
+    INSIGHTLENS_MODEL_REGISTRY=models.json python benchmarks/bench_registry.py --models fast accurate
+
+Each model is loaded through the registry (so INSIGHTLENS_OFFLINE applies)
+and unloaded again before the next one; the sentence cache is bypassed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import news_utils
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+LABELLED = os.path.join(os.path.dirname(__file__), "data", "labelled_sentences.jsonl")
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def measure(name, corpus, sentences, repeats):
+    before = rss_mb()
+    start = time.perf_counter()
+    with news_utils.pin_model(name) as loaded:
+        load_seconds = time.perf_counter() - start
+        loaded_mb = rss_mb() - before
+
+        sequences = loaded.tokenizer(sentences * 4, truncation=True)["input_ids"]
+        bulk, article = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            news_utils.run_batches(sequences, loaded=loaded)
+            bulk.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            news_utils.analyze_article(corpus)
+            article.append(time.perf_counter() - start)
+        labels = news_utils.run_batches(loaded.tokenizer(sentences, truncation=True)["input_ids"], loaded=loaded).argmax(axis=1)
+    news_utils.registry.entry(name).unload()
+    return {
+        "model": name,
+        "load_s": load_seconds,
+        "rss_mb": loaded_mb,
+        "sentences_per_s": len(sequences) / float(np.median(bulk)),
+        "article_ms": float(np.median(article)) * 1000,
+        "labels": labels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=news_utils.available_models())
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    news_utils.sentence_cache = None
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = f.read()
+    with open(LABELLED, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    sentences = [row["text"] for row in rows]
+    gold = np.array([news_utils.labels.index(row["label"]) for row in rows])
+
+    results = [measure(name, corpus, sentences, args.repeats) for name in args.models]
+    reference = next((r for r in results if r["model"] == news_utils.DEFAULT_MODEL), results[0])
+
+    print(f"{'model':<14}{'load s':>8}{'RSS MB':>9}{'sent/s':>10}{'article ms':>12}{'speedup':>9}{'agree':>8}{'accuracy':>10}")
+    for r in results:
+        print(f"{r['model']:<14}{r['load_s']:>8.2f}{r['rss_mb']:>9.1f}{r['sentences_per_s']:>10.1f}{r['article_ms']:>12.1f}"
+              f"{r['sentences_per_s'] / reference['sentences_per_s']:>8.2f}x"
+              f"{np.mean(r['labels'] == reference['labels']):>8.0%}{np.mean(r['labels'] == gold):>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
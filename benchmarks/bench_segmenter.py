@@ -0,0 +1,67 @@
+# benchmarks/bench_segmenter.py
+"""
+Sentence segmentation on the fixture corpora: the old text.split('.')
+versus utils.segmenter. Reports segmentation speed and how many sentences
+each produces (every sentence is one transformer input). No model is loaded.
+
+    python benchmarks/bench_segmenter.py --repeats 1 100
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.segmenter import sentence_offsets
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+CORPORA = {"en": os.path.join(DATA, "corpus.txt"), "hi": os.path.join(DATA, "corpus_hi.txt")}
+
+
+def split_on_periods(text):
+    return [piece.strip() for piece in text.split('.') if len(piece.strip()) > 5]
+
+
+def segment(text):
+    return [text[start:end] for start, end in sentence_offsets(text) if end - start > 5]
+
+
+def timed(fn, text, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(text)
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, nargs="+", default=[1, 100],
+                        help="copies of each corpus joined into one article")
+    parser.add_argument("--show", action="store_true", help="print the sentences the old split gets wrong")
+    args = parser.parse_args()
+
+    print(f"{'corpus':>7}{'copies':>8}{'KB':>8}{'split':>8}{'segment':>9}{'change':>8}{'split MB/s':>12}{'segment MB/s':>14}")
+    for name, path in CORPORA.items():
+        with open(path, encoding="utf-8") as f:
+            # One paragraph, as newspaper3k returns body text without line breaks inside a paragraph
+            corpus = " ".join(line.strip() for line in f if line.strip())
+        for copies in args.repeats:
+            text = " ".join([corpus] * copies)
+            megabytes = len(text.encode("utf-8")) / 1e6
+            old, old_s = timed(split_on_periods, text)
+            new, new_s = timed(segment, text)
+            print(f"{name:>7}{copies:>8}{megabytes * 1000:>8.1f}{len(old):>8}{len(new):>9}{len(new) / len(old) - 1:>+8.0%}"
+                  f"{megabytes / old_s:>12.1f}{megabytes / new_s:>14.1f}")
+        if args.show:
+            complete = {sentence.rstrip(".") for sentence in segment(corpus)}
+            for sentence in split_on_periods(corpus):
+                if sentence not in complete:
+                    print(f"    {sentence[:100]}")
+
+
+if __name__ == "__main__":
+    main()
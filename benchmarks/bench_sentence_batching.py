@@ -0,0 +1,70 @@
+# benchmarks/bench_sentence_batching.py
+"""
+Compare the old one-forward-pass-per-sentence loop with the batched path
+used by `sentence_tone_breakdown`.
+
+    python benchmarks/bench_sentence_batching.py --sentences 300 --batch-size 32
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import news_utils
+from utils.news_utils import get_model, score_texts
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+
+
+def load_sentences(n):
+    with open(CORPUS, encoding="utf-8") as f:
+        base = [line.strip() for line in f if line.strip()]
+    return [base[i % len(base)] for i in range(n)]
+
+
+def score_one_by_one(sentences):
+    tokenizer, model = get_model().tokenizer, get_model().model
+    rows = []
+    for sentence in sentences:
+        inputs = tokenizer(sentence, return_tensors="pt", truncation=True)
+        with torch.no_grad():
+            outputs = model(**inputs)
+            rows.append(torch.nn.functional.softmax(outputs.logits, dim=1).squeeze().numpy())
+    return np.array(rows)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sentences", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-tokens", type=int, default=None)
+    args = parser.parse_args()
+
+    sentences = load_sentences(args.sentences)
+    news_utils.sentence_cache = None  # measure the model, not the sentence cache
+    score_texts(sentences[:8])  # warm up kernels and allocator
+
+    loop_scores, loop_time = timed(score_one_by_one, sentences)
+    batch_scores, batch_time = timed(score_texts, sentences, args.batch_size, args.max_tokens)
+
+    print(f"{'mode':<12}{'seconds':>10}{'sentences/s':>14}")
+    print(f"{'loop':<12}{loop_time:>10.3f}{len(sentences) / loop_time:>14.1f}")
+    print(f"{'batched':<12}{batch_time:>10.3f}{len(sentences) / batch_time:>14.1f}")
+    print(f"speedup: {loop_time / batch_time:.2f}x")
+    print(f"max |score difference|: {np.abs(loop_scores - batch_scores).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_tokenization.py
+"""
+Tokenizer time per request: separate article + per-sentence tokenization
+versus one offset-mapped pass shared by windows and sentences.
+
+    python benchmarks/bench_tokenization.py --repeats 1 10 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import news_utils
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+
+
+def two_pass(text):
+    tokenizer = news_utils.get_model().tokenizer
+    article_ids = tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"]
+    sentences = [text[start:end] for start, end in news_utils.sentence_spans(text)]
+    sentence_ids = tokenizer(sentences, truncation=True)["input_ids"]
+    return article_ids, sentence_ids
+
+
+def single_pass(text):
+    encoding = news_utils.encode_article(text)
+    sentence_ids = news_utils.sentence_token_ids(text, encoding, news_utils.sentence_spans(text))
+    return encoding["input_ids"], sentence_ids
+
+
+def median_ms(fn, text, runs=5):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, nargs="+", default=[1, 10, 50], help="article = corpus repeated N times")
+    args = parser.parse_args()
+
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = f.read()
+    single_pass(corpus)  # load the model and warm the tokenizer
+
+    print(f"{'chars':>9}{'sentences':>11}{'two-pass ms':>13}{'single ms':>11}{'saved':>8}")
+    for repeats in args.repeats:
+        text = "\n".join([corpus] * repeats)
+        sentences = len(news_utils.sentence_spans(text))
+        before, after = median_ms(two_pass, text), median_ms(single_pass, text)
+        print(f"{len(text):>9}{sentences:>11}{before:>13.1f}{after:>11.1f}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
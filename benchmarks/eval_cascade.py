@@ -0,0 +1,57 @@
+# benchmarks/eval_cascade.py
+"""
+How much transformer work the lexicon cascade saves, and what it costs.
+
+Runs the held-out fixture corpus through sentence_tone_breakdown with and
+without the cascade and reports transformer calls saved, label
+disagreement and polarity drift on the sentences the lexicon tier settled.
+
+    python benchmarks/eval_cascade.py
+    INSIGHTLENS_LEXICON_MAX_SUBJECTIVITY=0.1 python benchmarks/eval_cascade.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import news_utils
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+
+
+def timed_breakdown(text, cascade):
+    start = time.perf_counter()
+    results = news_utils.sentence_tone_breakdown(text, cascade=cascade)
+    return results, time.perf_counter() - start
+
+
+def main():
+    with open(CORPUS, encoding="utf-8") as f:
+        text = f.read()
+
+    news_utils.sentence_cache = None  # compare model work, not cache hits
+    news_utils.sentence_tone_breakdown(text[:500], cascade=True)  # warm up model and TextBlob
+
+    full, full_time = timed_breakdown(text, cascade=False)
+    cascaded, cascade_time = timed_breakdown(text, cascade=True)
+
+    lexicon = [i for i, row in enumerate(cascaded) if row["tier"] == "lexicon"]
+    disagree = [i for i in range(len(full)) if full[i]["label"] != cascaded[i]["label"]]
+    drift = [abs(full[i]["polarity"] - cascaded[i]["polarity"]) for i in lexicon]
+
+    print(f"lexicon threshold:         subjectivity <= {news_utils.LEXICON_MAX_SUBJECTIVITY}")
+    print(f"sentences:                 {len(full)}")
+    print(f"transformer calls saved:   {len(lexicon)} ({len(lexicon) / len(full):.1%})")
+    print(f"label disagreement:        {len(disagree)} ({len(disagree) / len(full):.1%})")
+    print(f"mean |polarity drift|:     {np.mean(drift) if drift else 0.0:.3f} on lexicon-tier sentences")
+    print(f"time full / cascade:       {full_time * 1000:.1f} ms / {cascade_time * 1000:.1f} ms")
+    for i in disagree:
+        print(f"  - {full[i]['label']:>8} -> {cascaded[i]['label']:<8} {full[i]['sentence'][:80]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/load_test.py
+"""
+Throughput of /analyze at increasing client concurrency.
+
+By default the Flask app is driven in-process through its test client, so
+run it once with INSIGHTLENS_SCHEDULER=1 and once without to compare:
+
+    INSIGHTLENS_SCHEDULER=1 python benchmarks/load_test.py --clients 1 8 32
+
+Every client posts the same fixture article, so set
+INSIGHTLENS_SENTENCE_CACHE=off to measure the model rather than the cache.
+
+Pass --url to load-test an already running server instead.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+
+
+def load_payload():
+    with open(CORPUS, encoding="utf-8") as f:
+        text = f.read()
+    return {"manual": True, "title": "Load test", "text": text}
+
+
+def make_poster(url):
+    if url:
+        session = requests.Session()
+        return lambda payload: session.post(url, json=payload).status_code
+
+    from app.main import app
+    client = app.test_client()
+    return lambda payload: client.post("/analyze", json=payload).status_code
+
+
+def run_level(clients, requests_per_client, url, payload):
+    def client_loop(_):
+        post = make_poster(url)
+        latencies = []
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            status = post(payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                raise RuntimeError(f"/analyze returned HTTP {status}")
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = np.concatenate(list(pool.map(client_loop, range(clients))))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def fetch_stats(url):
+    if url:
+        return requests.get(url.rsplit("/", 1)[0] + "/stats").json()
+    from app.main import app
+    return app.test_client().get("/stats").get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=4, help="requests per client")
+    parser.add_argument("--url", default=None, help="e.g. http://127.0.0.1:5000/analyze")
+    args = parser.parse_args()
+
+    payload = load_payload()
+    make_poster(args.url)(payload)  # warm up
+
+    print(f"{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for clients in args.clients:
+        throughput, p50, p95 = run_level(clients, args.requests, args.url, payload)
+        print(f"{clients:>8}{throughput:>10.2f}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}")
+
+    print("inference stats:", fetch_stats(args.url))
+
+
+if __name__ == "__main__":
+    main()
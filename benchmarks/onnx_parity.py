@@ -0,0 +1,75 @@
+# benchmarks/onnx_parity.py
+"""
+Check that the ONNX Runtime backend reproduces the PyTorch softmax scores
+and compare their latency on the fixture corpus.
+
+    python benchmarks/onnx_parity.py --tolerance 1e-4
+
+Exits with status 1 when any score differs by more than the tolerance.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import news_utils
+from utils.backends import TorchBackend, OnnxBackend, export_onnx
+from utils.model_loader import LoadedModel
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+
+
+def load_sentences():
+    with open(CORPUS, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def score_with(backend, sequences, repeats):
+    loaded = news_utils.get_model()
+    loaded = LoadedModel(loaded.name, loaded.tokenizer, loaded.model, backend)
+    news_utils.run_batches(sequences[:4], loaded=loaded)  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        scores = news_utils.run_batches(sequences, loaded=loaded)
+        timings.append(time.perf_counter() - start)
+    return scores, np.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    sentences = load_sentences()
+    loaded = news_utils.get_model()
+    sequences = loaded.tokenizer(sentences, truncation=True)["input_ids"]
+
+    onnx_file = export_onnx(loaded.model, loaded.name, news_utils.CACHE_DIR, fingerprint=loaded.fingerprint)
+    torch_scores, torch_time = score_with(TorchBackend(loaded.model), sequences, args.repeats)
+    onnx_scores, onnx_time = score_with(OnnxBackend(onnx_file), sequences, args.repeats)
+
+    max_diff = float(np.abs(torch_scores - onnx_scores).max())
+    label_agreement = float((torch_scores.argmax(axis=1) == onnx_scores.argmax(axis=1)).mean())
+
+    print(f"{'backend':<8}{'median s':>10}{'sentences/s':>14}")
+    print(f"{'torch':<8}{torch_time:>10.4f}{len(sentences) / torch_time:>14.1f}")
+    print(f"{'onnx':<8}{onnx_time:>10.4f}{len(sentences) / onnx_time:>14.1f}")
+    print(f"speedup: {torch_time / onnx_time:.2f}x")
+    print(f"max |softmax difference|: {max_diff:.2e} (tolerance {args.tolerance:.0e})")
+    print(f"label agreement: {label_agreement:.1%}")
+
+    if max_diff > args.tolerance:
+        print("FAIL: ONNX scores drift beyond tolerance")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
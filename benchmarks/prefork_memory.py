@@ -0,0 +1,121 @@
+# benchmarks/prefork_memory.py
+"""
+Per-worker memory of the pre-fork server versus naive per-process loading.
+
+Starts `app/serve.py --workers N`, sends a few requests so every worker has
+run inference, and reads RSS / PSS / USS from /proc/<pid>/smaps_rollup.
+Then starts N independent processes that each load the model themselves
+and reports the same numbers.
+
+    python benchmarks/prefork_memory.py --workers 4
+
+Linux only (/proc/<pid>/smaps_rollup).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "corpus.txt")
+
+NAIVE_WORKER = """
+import sys, time
+sys.path.insert(0, {root!r})
+from utils.news_utils import preload_model, score_texts
+preload_model("blocking")
+score_texts(["warm " + str(i) for i in range(32)])
+print("ready", flush=True)
+time.sleep(3600)
+"""
+
+
+def memory_kb(pid):
+    """RSS, PSS and USS (private clean + private dirty) in kB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields["Rss"], fields["Pss"], fields["Private_Clean"] + fields["Private_Dirty"]
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def wait_ready(url, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url + "/readyz", timeout=1).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server did not become ready")
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    print(f"{'process':<14}{'RSS MB':>10}{'PSS MB':>10}{'USS MB':>10}")
+    for name, (rss, pss, uss) in rows:
+        print(f"{name:<14}{rss / 1024:>10.1f}{pss / 1024:>10.1f}{uss / 1024:>10.1f}")
+    total_pss = sum(pss for _, (_, pss, _) in rows)
+    print(f"{'total PSS':<14}{'':>10}{total_pss / 1024:>10.1f}")
+    return total_pss
+
+
+def measure_prefork(workers, port):
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "app", "serve.py"), "--workers", str(workers), "--port", str(port)])
+    try:
+        wait_ready(url)
+        with open(CORPUS, encoding="utf-8") as f:
+            payload = {"manual": True, "title": "Memory", "text": f.read()}
+        for _ in range(workers * 3):
+            requests.post(url + "/analyze", json=payload, timeout=120)
+
+        rows = [("parent", memory_kb(server.pid))]
+        rows += [(f"worker {i}", memory_kb(pid)) for i, pid in enumerate(children(server.pid))]
+        return print_table(f"pre-fork: {workers} workers sharing one model", rows)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def measure_naive(workers):
+    procs = [
+        subprocess.Popen([sys.executable, "-c", NAIVE_WORKER.format(root=ROOT)], stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    try:
+        for proc in procs:
+            proc.stdout.readline()
+        rows = [(f"process {i}", memory_kb(proc.pid)) for i, proc in enumerate(procs)]
+        return print_table(f"naive: {workers} processes each loading the model", rows)
+    finally:
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    prefork_total = measure_prefork(args.workers, args.port)
+    naive_total = measure_naive(args.workers)
+    print(f"\nmemory saved by pre-forking: {(naive_total - prefork_total) / 1024:.1f} MB "
+          f"({1 - prefork_total / naive_total:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/quantization_gate.py
+"""
+Accuracy-regression gate for INSIGHTLENS_QUANTIZE=1.
+
+Runs the labelled sentences in benchmarks/data/ through the fp32 model and
+its dynamic INT8 copy, then reports label agreement, accuracy against the
+stored labels, mean polarity drift, speedup and memory saved.
+
+    python benchmarks/quantization_gate.py --min-agreement 0.95 --max-drift 0.05
+
+Exits with status 1 when the quantized model falls outside the gate.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+# Add project root (parent of benchmarks/) to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import news_utils
+from utils.backends import TorchBackend, quantize_model
+from utils.model_loader import LoadedModel
+
+LABELLED = os.path.join(os.path.dirname(__file__), "data", "labelled_sentences.jsonl")
+
+
+def load_labelled():
+    with open(LABELLED, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [row["text"] for row in rows], np.array([news_utils.labels.index(row["label"]) for row in rows])
+
+
+def tensor_bytes(value):
+    if isinstance(value, torch.Tensor):
+        value = value.int_repr() if value.is_quantized else value
+        return value.nelement() * value.element_size()
+    if isinstance(value, (tuple, list)):
+        return sum(tensor_bytes(item) for item in value)
+    return 0
+
+
+def model_bytes(model):
+    # Quantized Linear layers keep (int8 weight, bias) in packed params
+    return sum(tensor_bytes(value) for value in model.state_dict().values())
+
+
+def score_with(model, sequences, repeats):
+    loaded = LoadedModel(news_utils.MODEL_NAME, news_utils.get_model().tokenizer, model, TorchBackend(model))
+    news_utils.run_batches(sequences[:4], loaded=loaded)  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        scores = news_utils.run_batches(sequences, loaded=loaded)
+        timings.append(time.perf_counter() - start)
+    return scores, np.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    parser.add_argument("--max-drift", type=float, default=0.05)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    if news_utils.QUANTIZE:
+        sys.exit("Run the gate without INSIGHTLENS_QUANTIZE so the fp32 weights are loaded")
+
+    texts, gold = load_labelled()
+    sequences = news_utils.get_model().tokenizer(texts, truncation=True)["input_ids"]
+
+    fp32 = news_utils.get_model().model
+    int8 = quantize_model(copy.deepcopy(fp32))
+
+    fp32_scores, fp32_time = score_with(fp32, sequences, args.repeats)
+    int8_scores, int8_time = score_with(int8, sequences, args.repeats)
+
+    fp32_labels = fp32_scores.argmax(axis=1)
+    int8_labels = int8_scores.argmax(axis=1)
+    agreement = float((fp32_labels == int8_labels).mean())
+    drift = float(np.abs((fp32_scores[:, 2] - fp32_scores[:, 0]) - (int8_scores[:, 2] - int8_scores[:, 0])).mean())
+    fp32_size, int8_size = model_bytes(fp32), model_bytes(int8)
+
+    print(f"sentences:            {len(texts)}")
+    print(f"label agreement:      {agreement:.1%}")
+    print(f"accuracy fp32 / int8: {(fp32_labels == gold).mean():.1%} / {(int8_labels == gold).mean():.1%}")
+    print(f"mean polarity drift:  {drift:.4f}")
+    print(f"latency fp32 / int8:  {fp32_time * 1000:.1f} ms / {int8_time * 1000:.1f} ms ({fp32_time / int8_time:.2f}x)")
+    print(f"weights fp32 / int8:  {fp32_size / 2**20:.1f} MB / {int8_size / 2**20:.1f} MB "
+          f"(saves {(fp32_size - int8_size) / 2**20:.1f} MB per worker)")
+
+    if agreement < args.min_agreement or drift > args.max_drift:
+        print(f"FAIL: gate requires agreement >= {args.min_agreement:.0%} and drift <= {args.max_drift}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
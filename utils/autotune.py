@@ -0,0 +1,177 @@
+"""
+Calibrate torch thread counts and inference batch size for this CPU.
+
+    python -m utils.autotune --threads 1 2 4 8 --batch-sizes 8 16 32 64
+
+Runs a short sweep over a built-in synthetic sentence set, prints a
+throughput/latency table and writes the best configuration for two
+profiles to <INSIGHTLENS_CACHE_DIR>/autotune.json:
+
+    throughput - most sentences per second per core (many workers, bulk jobs)
+    latency    - fastest single article (one worker serving interactive traffic)
+
+utils.news_utils applies the profile named by INSIGHTLENS_TUNE_PROFILE when
+the default model loads; other registry entries share its settings.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+SUBJECTS = ["The government", "Opposition leaders", "The Finance Minister", "Farmers' unions", "The Supreme Court", "Local residents"]
+VERBS = ["announced", "criticised", "welcomed", "questioned", "defended", "rejected"]
+OBJECTS = [
+    "the new scheme",
+    "the budget allocation for rural health centres",
+    "the decision to delay the elections in three districts",
+    "a proposal that would change how states share tax revenue with the Centre over the next five years",
+]
+TAILS = ["", " on Monday", " after weeks of protests and several rounds of inconclusive talks"]
+
+ARTICLE_SENTENCES = 30  # "one article" for the latency profile
+
+
+def synthetic_sentences():
+    """A deterministic mix of short and long news-style sentences."""
+    sentences = []
+    for i, subject in enumerate(SUBJECTS):
+        for j, verb in enumerate(VERBS):
+            obj = OBJECTS[(i + j) % len(OBJECTS)]
+            tail = TAILS[(i * j) % len(TAILS)]
+            sentences.append(f"{subject} {verb} {obj}{tail}.")
+    return sentences
+
+
+def host_signature():
+    import torch
+
+    return {"cpu_count": os.cpu_count(), "machine": platform.machine(), "torch": torch.__version__}
+
+
+def set_threads(threads, interop_threads=None):
+    import torch
+
+    torch.set_num_threads(threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            pass  # can only be set once, before any inter-op work
+
+
+def sweep(sequences, score, thread_counts, batch_sizes, repeats=3):
+    """
+    Time `score(sequences, batch_size)` for every thread count / batch size pair.
+    Returns one row per pair with throughput (sentences/s, and per thread) and
+    the median latency of scoring one article-sized slice.
+    """
+    import torch
+
+    article = sequences[:ARTICLE_SENTENCES]
+    rows = []
+    original_threads = torch.get_num_threads()
+    try:
+        for threads in thread_counts:
+            torch.set_num_threads(threads)
+            for batch_size in batch_sizes:
+                score(article, batch_size)  # warm up this shape
+                bulk, single = [], []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    score(sequences, batch_size)
+                    bulk.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    score(article, batch_size)
+                    single.append(time.perf_counter() - start)
+                throughput = len(sequences) / float(np.median(bulk))
+                rows.append({
+                    "threads": threads,
+                    "batch_size": batch_size,
+                    "sentences_per_s": round(throughput, 1),
+                    "sentences_per_s_per_thread": round(throughput / threads, 1),
+                    "article_latency_ms": round(float(np.median(single)) * 1000, 2),
+                })
+    finally:
+        torch.set_num_threads(original_threads)
+    return rows
+
+
+def pick_profiles(rows):
+    best_throughput = max(rows, key=lambda r: r["sentences_per_s_per_thread"])
+    best_latency = min(rows, key=lambda r: r["article_latency_ms"])
+    return {
+        "throughput": {"threads": best_throughput["threads"], "interop_threads": 1, "batch_size": best_throughput["batch_size"]},
+        "latency": {"threads": best_latency["threads"], "interop_threads": 1, "batch_size": best_latency["batch_size"]},
+    }
+
+
+def save_tuning(path, rows, model_name):
+    tuning = {"host": host_signature(), "model": model_name, "profiles": pick_profiles(rows), "results": rows}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(tuning, f, indent=2)
+    return tuning
+
+
+def load_tuning(path, profile, model_name):
+    """The saved settings for `profile`, or None if missing or calibrated on another host/model."""
+    if profile == "off" or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            tuning = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if tuning.get("host") != host_signature() or tuning.get("model") != model_name:
+        return None
+    return tuning["profiles"].get(profile)
+
+
+def default_thread_counts():
+    cores = os.cpu_count() or 1
+    counts, threads = [], 1
+    while threads < cores:
+        counts.append(threads)
+        threads *= 2
+    return counts + [cores]
+
+
+def calibrate(score, tokenizer, path, model_name, thread_counts=None, batch_sizes=None, repeats=3):
+    sequences = tokenizer(synthetic_sentences(), truncation=True)["input_ids"] * 4
+    rows = sweep(sequences, score, thread_counts or default_thread_counts(), batch_sizes or [8, 16, 32, 64], repeats)
+    return save_tuning(path, rows, model_name)
+
+
+def print_table(tuning):
+    print(f"{'threads':>8}{'batch':>7}{'sent/s':>10}{'sent/s/thr':>12}{'article ms':>12}")
+    for row in tuning["results"]:
+        print(f"{row['threads']:>8}{row['batch_size']:>7}{row['sentences_per_s']:>10.1f}"
+              f"{row['sentences_per_s_per_thread']:>12.1f}{row['article_latency_ms']:>12.2f}")
+    for name, settings in tuning["profiles"].items():
+        print(f"{name:>10} profile: {settings}")
+
+
+if __name__ == "__main__":
+    from utils import news_utils
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=None)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    loaded = news_utils.get_model()
+    tuning = calibrate(
+        lambda sequences, batch_size: news_utils.run_batches(sequences, batch_size=batch_size, loaded=loaded),
+        loaded.tokenizer,
+        news_utils.TUNE_FILE,
+        loaded.name,
+        args.threads,
+        args.batch_sizes,
+        args.repeats,
+    )
+    print_table(tuning)
+    print("saved to", news_utils.TUNE_FILE)
@@ -0,0 +1,250 @@
+import os
+import threading
+
+import numpy as np
+
+from utils.model_loader import weights_fingerprint
+
+# torch is imported where it is used: a web worker scoring on the model-server
+# sidecar imports this module but never runs a model itself
+
+
+class TorchBackend:
+    """Eager PyTorch execution of a transformers sequence classifier."""
+
+    name = "torch"
+
+    def __init__(self, model):
+        self.model = model.eval()
+
+    def predict(self, input_ids, attention_mask):
+        import torch
+
+        with torch.no_grad():
+            outputs = self.model(input_ids=torch.from_numpy(input_ids), attention_mask=torch.from_numpy(attention_mask))
+        return outputs.logits.numpy()
+
+
+class OnnxBackend:
+    """ONNX Runtime execution of a graph written by `export_onnx`."""
+
+    name = "onnx"
+
+    def __init__(self, path):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("INSIGHTLENS_BACKEND=onnx needs onnxruntime: pip install onnxruntime onnx")
+
+        self.path = path
+        self.session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+
+    def predict(self, input_ids, attention_mask):
+        return self.session.run(["logits"], {"input_ids": input_ids, "attention_mask": attention_mask})[0]
+
+
+def logits_only(model):
+    """Tensor-in, tensor-out wrapper so the classifier can be traced."""
+    import torch
+
+    class LogitsOnly(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+    return LogitsOnly(model)
+
+
+class CompiledTorchBackend:
+    """
+    Graph-optimized PyTorch execution over padded sequence-length buckets.
+
+    Every batch is padded up to the smallest bucket that fits, so only a few
+    fixed shapes are ever compiled. mode="trace" stores one TorchScript
+    module per bucket under <cache_dir>/traced and reloads it on restart;
+    mode="compile" uses torch.compile with Inductor's on-disk cache in
+    <cache_dir>/inductor. Any bucket that fails to trace, compile or run
+    falls back to the eager model.
+    """
+
+    def __init__(self, model, model_name, cache_dir, pad_token_id, mode="trace", buckets=(32, 64, 128, 256, 512), overwrite=False, fingerprint=None):
+        import torch
+
+        self.name = f"torch-{mode}"
+        self.model = model.eval()
+        self.eager = TorchBackend(model)
+        self.mode = mode
+        self.buckets = sorted(buckets)
+        self.pad_token_id = pad_token_id
+        self.overwrite = overwrite
+        self.cache_dir = os.path.join(cache_dir, "traced" if mode == "trace" else "inductor")
+        # Traced files have the weights frozen in: new weights under the same name need new files
+        fingerprint = fingerprint or weights_fingerprint(model)
+        self.model_key = f"{model_name.replace('/', '--')}-{fingerprint}-{'int8' if is_quantized(model) else 'fp32'}-torch{torch.__version__}"
+
+        self.compiled = {}
+        self.failed = {}
+        self._lock = threading.Lock()
+        if mode == "compile":
+            os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", self.cache_dir)
+        elif mode != "trace":
+            raise ValueError(f"Unknown compile mode: {mode} (expected 'trace' or 'compile')")
+
+    def bucket_for(self, length):
+        for bucket in self.buckets:
+            if length <= bucket:
+                return bucket
+        return None
+
+    def trace_path(self, bucket):
+        return os.path.join(self.cache_dir, f"{self.model_key}-b{bucket}.pt")
+
+    def compile_bucket(self, bucket):
+        import torch
+
+        if self.mode == "compile":
+            return torch.compile(logits_only(self.model).eval(), dynamic=False)
+
+        path = self.trace_path(bucket)
+        if os.path.exists(path) and not self.overwrite:
+            return torch.jit.load(path)
+
+        # Example with real padding so the traced graph keeps the attention mask path
+        example_ids = torch.full((2, bucket), self.pad_token_id, dtype=torch.long)
+        example_ids[:, :2] = 0
+        example_mask = torch.zeros((2, bucket), dtype=torch.long)
+        example_mask[0, :] = 1
+        example_mask[1, : max(bucket // 2, 1)] = 1
+        with torch.no_grad():
+            traced = torch.jit.freeze(torch.jit.trace(logits_only(self.model).eval(), (example_ids, example_mask), check_trace=False))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        traced.save(tmp_path)
+        os.replace(tmp_path, path)
+        return traced
+
+    def get_compiled(self, bucket):
+        if bucket in self.compiled:
+            return self.compiled[bucket]
+        with self._lock:
+            if bucket not in self.compiled and bucket not in self.failed:
+                try:
+                    self.compiled[bucket] = self.compile_bucket(bucket)
+                except Exception as e:
+                    self.failed[bucket] = str(e)
+        return self.compiled.get(bucket)
+
+    def predict(self, input_ids, attention_mask):
+        import torch
+
+        bucket = self.bucket_for(input_ids.shape[1])
+        compiled = self.get_compiled(bucket) if bucket is not None else None
+        if compiled is None:
+            return self.eager.predict(input_ids, attention_mask)
+
+        extra = bucket - input_ids.shape[1]
+        ids = np.pad(input_ids, ((0, 0), (0, extra)), constant_values=self.pad_token_id)
+        mask = np.pad(attention_mask, ((0, 0), (0, extra)), constant_values=0)
+        try:
+            with torch.no_grad():
+                return compiled(torch.from_numpy(ids), torch.from_numpy(mask)).numpy()
+        except Exception as e:
+            with self._lock:
+                self.failed[bucket] = str(e)
+                self.compiled.pop(bucket, None)
+            return self.eager.predict(input_ids, attention_mask)
+
+    def warm(self):
+        """Trace/compile (or load from disk) every bucket before traffic arrives."""
+        for bucket in self.buckets:
+            ids = np.full((1, bucket), self.pad_token_id, dtype=np.int64)
+            self.predict(ids, np.ones_like(ids))
+
+    def status(self):
+        return {"mode": self.mode, "compiled_buckets": sorted(self.compiled), "failed_buckets": dict(self.failed)}
+
+
+def is_quantized(model):
+    return any(type(module).__module__.startswith("torch.ao.nn.quantized") for module in model.modules())
+
+
+export_lock = threading.Lock()
+
+
+def onnx_path(model_name, cache_dir, fingerprint):
+    return os.path.join(cache_dir, "onnx", f"{model_name.replace('/', '--')}-{fingerprint}.onnx")
+
+
+def export_onnx(model, model_name, cache_dir, overwrite=False, fingerprint=None):
+    """
+    Write `model` as an ONNX graph with dynamic batch and sequence axes.
+    The export happens once per set of weights (`fingerprint`, default
+    computed from `model`); later calls return the cached file.
+    """
+    import torch
+
+    path = onnx_path(model_name, cache_dir, fingerprint or weights_fingerprint(model))
+    with export_lock:
+        if os.path.exists(path) and not overwrite:
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        dummy_ids = torch.ones((1, 8), dtype=torch.long)
+        dummy_mask = torch.ones((1, 8), dtype=torch.long)
+        tmp_path = f"{path}.{os.getpid()}.tmp"  # other processes may be exporting the same graph
+        with torch.no_grad():
+            torch.onnx.export(
+                model.eval(),
+                (dummy_ids, dummy_mask),
+                tmp_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "logits": {0: "batch"},
+                },
+                opset_version=17,
+                dynamo=False,
+            )
+        os.replace(tmp_path, path)
+        return path
+
+
+def quantize_model(model):
+    """Dynamic INT8 quantization of every Linear layer (weights int8, activations quantized on the fly)."""
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    return quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_backend(name, model, model_name, cache_dir, compile_mode="off", pad_token_id=1, buckets=None, overwrite=False, fingerprint=None):
+    """
+    `fingerprint` (see `weights_fingerprint`, of the unquantized weights)
+    keys cached graphs; `overwrite` rebuilds them anyway.
+    """
+    if name == "torch":
+        if compile_mode != "off":
+            return CompiledTorchBackend(model, model_name, cache_dir, pad_token_id, compile_mode, buckets or (32, 64, 128, 256, 512), overwrite, fingerprint)
+        return TorchBackend(model)
+    if name == "onnx":
+        return OnnxBackend(export_onnx(model, model_name, cache_dir, overwrite, fingerprint))
+    raise ValueError(f"Unknown inference backend: {name} (expected 'torch' or 'onnx')")
+
+
+def softmax(logits):
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return (shifted / shifted.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+if __name__ == "__main__":
+    # One-time export: python -m utils.backends
+    from transformers import AutoModelForSequenceClassification
+    from utils.news_utils import MODEL_NAME, CACHE_DIR
+
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    print("ONNX graph written to", export_onnx(model, MODEL_NAME, CACHE_DIR, overwrite=True))
@@ -0,0 +1,130 @@
+import os
+import threading
+import queue
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def bucket(n):
+    """Upper bound of the power-of-two histogram bucket holding n (0, 1, 2, 4, 8, ...)."""
+    upper = 1 if n > 0 else 0
+    while upper < n:
+        upper *= 2
+    return upper
+
+
+def histogram(counter):
+    return {f"<={upper}": count for upper, count in sorted(counter.items())}
+
+
+class BatchScheduler:
+    """
+    Collects token sequences from concurrent callers into shared batches.
+
+    Every caller submits its own list of sequences and gets a Future back. A
+    single worker thread drains the queue: it waits for the first pending
+    sequence, keeps collecting for at most `max_wait_ms` or until
+    `max_batch_size` sequences are queued, runs them through `run_batch`
+    in one go and hands every caller its own slice of the scores.
+
+    A `context` passed to `submit` (e.g. the model version a request is
+    pinned to) is handed to `run_batch(sequences, context)`; sequences with
+    different contexts are never mixed in one batch.
+    """
+
+    def __init__(self, run_batch, max_batch_size=64, max_wait_ms=5.0):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._start()
+        # Threads do not survive fork(): pre-forked workers get a fresh queue and worker thread
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queue_depths = Counter()
+        self._batches = 0
+        self._sequences = 0
+
+        self._worker = threading.Thread(target=self._loop, name="insightlens-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, sequences, context=None):
+        future = Future()
+        if not sequences:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+
+        job = {"future": future, "scores": [None] * len(sequences), "remaining": len(sequences), "context": context}
+        for index, sequence in enumerate(sequences):
+            self._queue.put((job, index, sequence))
+        return future
+
+    def score(self, sequences, context=None):
+        return self.submit(sequences, context).result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "sequences": self._sequences,
+                "mean_batch_size": round(self._sequences / self._batches, 2) if self._batches else 0.0,
+                "batch_size_histogram": histogram(self._batch_sizes),
+                "queue_depth_histogram": histogram(self._queue_depths),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+            }
+
+    def _collect(self):
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _loop(self):
+        while True:
+            items = self._collect()
+            depth = self._queue.qsize()
+
+            groups = {}
+            for item in items:
+                groups.setdefault(id(item[0]["context"]), []).append(item)
+            for group in groups.values():
+                self._run(group, depth)
+
+    def _run(self, items, depth):
+        try:
+            scores = self.run_batch([sequence for _, _, sequence in items], items[0][0]["context"])
+        except Exception as e:
+            for job, _, _ in items:
+                if not job["future"].done():
+                    job["future"].set_exception(e)
+            return
+
+        with self._lock:
+            self._batches += 1
+            self._sequences += len(items)
+            self._batch_sizes[bucket(len(items))] += 1
+            self._queue_depths[bucket(depth)] += 1
+
+        for (job, index, _), row in zip(items, scores):
+            if job["future"].done():
+                continue
+            job["scores"][index] = row
+            job["remaining"] -= 1
+            if job["remaining"] == 0:
+                job["future"].set_result(np.stack(job["scores"]))
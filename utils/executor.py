@@ -0,0 +1,102 @@
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class InferenceExecutor:
+    """
+    Runs model work on a fixed number of execution slots.
+
+    Each slot is one worker thread that owns a replica of the model built by
+    `make_replica(slot, base)` - at least its own tokenizer, optionally its
+    own copy of the weights - so no tokenizer or model is ever used by two
+    threads at once. Callers `submit(fn, base)` and get a Future; the next
+    free slot runs `fn(replica)` on its replica of `base`. Replicas are held
+    weakly per base model, so a swapped-out model's replicas go with it.
+    Queue wait and per-slot busy time are tracked for `stats()`.
+    """
+
+    def __init__(self, make_replica, slots=2, wait_samples=1000):
+        self.make_replica = make_replica
+        self.slots = slots
+        self.wait_samples = wait_samples
+        self._replicas = [weakref.WeakKeyDictionary() for _ in range(slots)]
+
+        self._start()
+        # Threads do not survive fork(): pre-forked workers get a fresh queue and slot threads
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=self.wait_samples)
+        self._busy = [0.0] * self.slots
+        self._started = time.perf_counter()
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0}
+
+        self._workers = [
+            threading.Thread(target=self._loop, args=(slot,), name=f"insightlens-slot-{slot}", daemon=True)
+            for slot in range(self.slots)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, fn, base):
+        future = Future()
+        with self._lock:
+            self._counters["submitted"] += 1
+        self._queue.put((future, fn, base, time.perf_counter()))
+        return future
+
+    def run(self, fn, base):
+        return self.submit(fn, base).result()
+
+    def replica(self, slot, base):
+        replicas = self._replicas[slot]
+        if base not in replicas:
+            replicas[base] = self.make_replica(slot, base)
+        return replicas[base]
+
+    def stats(self):
+        with self._lock:
+            elapsed = max(time.perf_counter() - self._started, 1e-9)
+            waits = np.array(self._waits) * 1000 if self._waits else np.zeros(1)
+            utilisation = [round(busy / elapsed, 4) for busy in self._busy]
+            return {
+                **self._counters,
+                "slots": self.slots,
+                "replicas": sum(len(replicas) for replicas in self._replicas),
+                "queue_depth": self._queue.qsize(),
+                "wait_ms_p50": round(float(np.percentile(waits, 50)), 3),
+                "wait_ms_p95": round(float(np.percentile(waits, 95)), 3),
+                "wait_ms_max": round(float(waits.max()), 3),
+                "slot_utilisation": utilisation,
+                "utilisation": round(sum(utilisation) / self.slots, 4),
+            }
+
+    def _loop(self, slot):
+        while True:
+            future, fn, base, submitted = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            start = time.perf_counter()
+            result = error = None
+            try:
+                result = fn(self.replica(slot, base))
+            except Exception as e:
+                error = e
+            with self._lock:
+                self._waits.append(start - submitted)
+                self._busy[slot] += time.perf_counter() - start
+                self._counters["failed" if error else "completed"] += 1
+            del base  # don't keep a swapped-out model alive while idle
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,203 @@
+import ctypes
+import gc
+import hashlib
+import threading
+import time
+
+
+class LoadedModel:
+    """Everything needed to score text with one model: tokenizer, weights and execution backend."""
+
+    def __init__(self, name, tokenizer, model, backend, max_length=512, label_order=None, precision="fp32", fingerprint=None):
+        self.name = name
+        self.tokenizer = tokenizer
+        self.model = model
+        self.backend = backend
+        self.max_length = max_length      # tokens per sequence, special tokens included
+        self.label_order = label_order    # model output columns in Negative/Neutral/Positive order (None = already)
+        self.precision = precision
+        self.fingerprint = fingerprint    # identifies the weights themselves (see `weights_fingerprint`)
+        self.version = name  # "<name>#<generation>" once LazyModel has installed it
+        self.vocabulary_match = None  # (primary version, same vocabulary?) once compared as a shadow candidate
+
+
+def weights_fingerprint(model, samples=256):
+    """
+    Short hash of a model's weights: every tensor's name, shape and an evenly
+    strided sample of its values. New weights loaded under an old name get a
+    new fingerprint; the same files always give the same one.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for key, value in model.state_dict().items():
+        for tensor in state_tensors(value):
+            if tensor.is_quantized:
+                tensor = tensor.dequantize()
+            flat = tensor.detach().flatten()
+            digest.update(f"{key}{tuple(tensor.shape)}".encode("utf-8"))
+            digest.update(flat[::max(1, flat.numel() // samples)].float().cpu().numpy().tobytes())
+    return digest.hexdigest()
+
+
+def state_tensors(value):
+    """The tensors in a state_dict value (INT8 models store packed (weight, bias) tuples next to dtypes)."""
+    if hasattr(value, "detach"):
+        yield value
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            yield from state_tensors(item)
+
+
+class LazyModel:
+    """
+    Loads a model on first use instead of at import time.
+
+    `preload()` starts loading (optionally in a background thread) and runs
+    the warmup batch, so orchestration can hold traffic back until `status()`
+    says the model is ready. Callers that arrive earlier simply block until
+    the load finishes.
+
+    States: idle -> loading -> warming -> ready (or failed).
+
+    `swap()` replaces a ready model without downtime: the replacement loads
+    and warms in the background while the current one keeps serving, then
+    new callers get it from a single assignment. Callers still holding the
+    old LoadedModel finish on it, and its memory goes once they let go.
+    A successful swap's loader becomes the one later loads use.
+    """
+
+    def __init__(self, loader, warmup=None, label=None):
+        self.loader = loader
+        self.warmup = warmup
+        self.label = label  # prefixed to versions, e.g. "fast:<name>#1"
+
+        self.state = "idle"
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+
+        self.generation = 0
+        self.swap_state = None
+        self.swap_error = None
+
+        self._loaded = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._swap_thread = None
+
+    def get(self):
+        loaded = self._loaded
+        if loaded is not None:
+            return loaded
+        return self._load(loaded_state="ready")
+
+    def _load(self, loaded_state):
+        with self._lock:
+            if self._loaded is None:
+                self.state = "loading"
+                self.error = None
+                start = time.perf_counter()
+                try:
+                    loaded = self.loader()
+                except Exception as e:
+                    self.state = "failed"
+                    self.error = str(e)
+                    raise
+                self._install(loaded)
+                self.load_seconds = round(time.perf_counter() - start, 3)
+                self.state = loaded_state
+            return self._loaded
+
+    def preload(self, background=True):
+        """Load and warm the model in a daemon thread; with `background=False`, wait for it."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load_and_warm, name="insightlens-preload", daemon=True)
+                self._thread.start()
+            thread = self._thread
+        if not background:
+            thread.join()
+        return thread
+
+    def unload(self):
+        """Drop the loaded model (callers still holding it keep it); the next use loads it again."""
+        with self._lock:
+            self._loaded = None
+            self._thread = None
+            self.state = "idle"
+        release_memory()
+
+    def swap(self, loader=None, background=True):
+        """Load and warm a replacement (with `loader`, default the original one) and switch to it."""
+        with self._lock:
+            if self._swap_thread is not None and self._swap_thread.is_alive():
+                raise RuntimeError("A model swap is already in progress")
+            self.swap_state = "loading"
+            self.swap_error = None
+            self._swap_thread = threading.Thread(target=self._swap, args=(loader or self.loader,), name="insightlens-swap", daemon=True)
+            self._swap_thread.start()
+            thread = self._swap_thread
+        if not background:
+            thread.join()
+        return thread
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def status(self):
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "error": self.error,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "version": self._loaded.version if self._loaded is not None else None,
+            "swap": {"state": self.swap_state, "error": self.swap_error},
+        }
+
+    def _install(self, loaded):
+        self.generation += 1
+        loaded.version = f"{self.label + ':' if self.label else ''}{loaded.name}#{self.generation}"
+        self._loaded = loaded
+
+    def _swap(self, loader):
+        try:
+            loaded = loader()
+            self.swap_state = "warming"
+            if self.warmup is not None:
+                self.warmup(loaded)
+        except Exception as e:
+            self.swap_state = "failed"
+            self.swap_error = str(e)
+            return
+
+        with self._lock:
+            self._install(loaded)
+            self.loader = loader  # reloads after an unload (e.g. registry eviction) keep the swapped-in checkpoint
+            self.state = "ready"
+            self.error = None
+        self.swap_state = "done"
+        release_memory()
+
+    def _load_and_warm(self):
+        try:
+            loaded = self._load(loaded_state="warming")
+            if self.state == "ready":
+                return
+            start = time.perf_counter()
+            if self.warmup is not None:
+                self.warmup(loaded)
+            self.warmup_seconds = round(time.perf_counter() - start, 3)
+            self.state = "ready"
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+
+
+def release_memory():
+    """Collect the swapped-out model and hand freed heap pages back to the OS where glibc allows it."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
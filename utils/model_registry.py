@@ -0,0 +1,86 @@
+import json
+import threading
+from collections import OrderedDict
+
+from utils.model_loader import LazyModel
+
+
+def load_registry_file(path, specs):
+    """Merge model specs from a JSON file ({"<name>": {"path": ..., ...}}) over `specs`."""
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+    merged = {name: dict(spec) for name, spec in specs.items()}
+    for name, spec in overrides.items():
+        merged[name] = {**merged.get(name, {}), **spec}
+    return merged
+
+
+class ModelRegistry:
+    """
+    Named models (path, backend, max length, label map) that load on first use.
+
+    Each entry is a LazyModel; `load(name, spec)` builds it and `warmup`
+    runs before it serves. At most `max_loaded` models stay in memory:
+    using another one unloads the least recently used entry first. The
+    default entry is never evicted, so readiness does not flap. Requests
+    already holding an evicted model finish on it.
+    """
+
+    def __init__(self, specs, load, warmup=None, default=None, max_loaded=2):
+        self.specs = specs
+        self.default = default or next(iter(specs))
+        self.max_loaded = max(1, max_loaded)
+        self.models = {
+            name: LazyModel(lambda name=name: load(name, self.specs[name]), warmup, label=name)
+            for name in specs
+        }
+        self.evictions = 0
+
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def entry(self, name=None):
+        name = name or self.default
+        if name not in self.models:
+            raise ValueError(f"Unknown model: {name} (available: {', '.join(self.models)})")
+        return self.models[name]
+
+    def get(self, name=None):
+        name = name or self.default
+        lazy = self.entry(name)
+        if lazy.state in ("idle", "failed") and name != self.default:
+            self._make_room(name)
+            lazy.preload(background=False)
+        loaded = lazy.get()
+        with self._lock:
+            self._recent[name] = True
+            self._recent.move_to_end(name)
+        return loaded
+
+    def _make_room(self, name):
+        with self._lock:
+            # Least recently used first; models loaded outside `get()` (e.g. preloaded) count as oldest
+            order = list(self._recent)
+            loaded = sorted(
+                (n for n, lazy in self.models.items() if n != name and lazy.state != "idle"),
+                key=lambda n: order.index(n) if n in order else -1,
+            )
+            while len(loaded) >= self.max_loaded:
+                victims = [n for n in loaded if n != self.default]
+                if not victims:
+                    break
+                self.models[victims[0]].unload()
+                self._recent.pop(victims[0], None)
+                loaded.remove(victims[0])
+                self.evictions += 1
+
+    def stats(self):
+        return {
+            "default": self.default,
+            "max_loaded": self.max_loaded,
+            "evictions": self.evictions,
+            "models": {
+                name: {"path": self.specs[name].get("path"), **lazy.status()}
+                for name, lazy in self.models.items()
+            },
+        }
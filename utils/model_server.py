@@ -0,0 +1,224 @@
+"""
+Model-server sidecar: one process owns the model and scores token ids for
+every web worker on the host over a Unix domain socket.
+
+    python -m utils.model_server --socket /tmp/insightlens.sock
+
+Web workers started with INSIGHTLENS_MODEL_SERVER=/tmp/insightlens.sock
+only load the tokenizer; utils.news_utils sends them token ids here and
+gets softmax scores back. Requests from all connections are merged by the
+batching scheduler, so batches are shared across workers. SIGHUP reloads
+the model in the background without dropping connections; every SCORE
+response names the model version and weights fingerprint that scored it,
+and MODEL asks for the ones serving now, so workers never mix scores from
+old and new weights in their sentence caches.
+
+Framing (little-endian): every message is a 5-byte header - op/status
+(uint8) and payload length (uint32) - followed by the payload.
+
+    SCORE request   uint32 n, n x uint32 lengths, sum(lengths) x uint32 token ids
+    SCORE response  uint32 n, uint32 k, n*k x float32 scores, then UTF-8 JSON {"version", "fingerprint"}
+    STATUS          empty request, JSON response
+    MODEL           empty request, JSON {"version", "fingerprint"} of the current model
+    error response  status 1, UTF-8 message
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+
+OP_SCORE = 1
+OP_STATUS = 2
+OP_MODEL = 3
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+HEADER = struct.Struct("<BI")
+
+
+def recv_exactly(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("model server connection closed")
+        received += n
+    return bytes(buf)
+
+
+def send_frame(sock, code, payload=b""):
+    sock.sendall(HEADER.pack(code, len(payload)) + payload)
+
+
+def recv_frame(sock):
+    code, size = HEADER.unpack(recv_exactly(sock, HEADER.size))
+    return code, recv_exactly(sock, size) if size else b""
+
+
+def encode_sequences(sequences):
+    lengths = np.array([len(seq) for seq in sequences], dtype="<u4")
+    ids = np.concatenate([np.asarray(seq, dtype="<u4") for seq in sequences]) if sequences else np.zeros(0, dtype="<u4")
+    return struct.pack("<I", len(sequences)) + lengths.tobytes() + ids.tobytes()
+
+
+def decode_sequences(payload):
+    (n,) = struct.unpack_from("<I", payload)
+    lengths = np.frombuffer(payload, dtype="<u4", count=n, offset=4)
+    ids = np.frombuffer(payload, dtype="<u4", offset=4 + 4 * n).astype(np.int64)
+    bounds = np.zeros(n + 1, dtype=np.int64)
+    bounds[1:] = np.cumsum(lengths)
+    return [ids[bounds[i]:bounds[i + 1]].tolist() for i in range(n)]
+
+
+def encode_scores(scores, model):
+    scores = np.asarray(scores, dtype="<f4")
+    return struct.pack("<II", *scores.shape) + scores.tobytes() + json.dumps(model).encode("utf-8")
+
+
+def decode_scores(payload):
+    """(scores, {"version", "fingerprint"} of the model that produced them)"""
+    n, k = struct.unpack_from("<II", payload)
+    scores = np.frombuffer(payload, dtype="<f4", count=n * k, offset=8).reshape(n, k).astype(np.float32)
+    return scores, json.loads(payload[8 + 4 * n * k:])
+
+
+def model_info(loaded):
+    return {"version": loaded.version, "fingerprint": loaded.fingerprint}
+
+
+class ModelClient:
+    """
+    Client side of the sidecar protocol. Every thread keeps its own
+    connection, so concurrent requests never interleave frames.
+    """
+
+    def __init__(self, path, timeout=60.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        # Sockets must not be shared across fork(): drop the inherited ones
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._local = threading.local()
+
+    def _connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            self._local.sock = sock
+        return sock
+
+    def _request(self, op, payload=b""):
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_frame(sock, op, payload)
+                status, response = recv_frame(sock)
+                break
+            except OSError:
+                # Stale connection (e.g. the sidecar restarted): reconnect once
+                self._close()
+                if attempt:
+                    raise
+        if status != STATUS_OK:
+            raise RuntimeError(f"model server error: {response.decode('utf-8', 'replace')}")
+        return response
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def score(self, sequences):
+        """Scores for `sequences`; `scored_by()` then names the model version that produced them."""
+        scores, self._local.scored_by = decode_scores(self._request(OP_SCORE, encode_sequences(sequences)))
+        return scores
+
+    def scored_by(self):
+        return getattr(self._local, "scored_by", None)
+
+    def model(self):
+        """{"version", "fingerprint"} of the model the sidecar is serving now."""
+        return json.loads(self._request(OP_MODEL))
+
+    def status(self):
+        return json.loads(self._request(OP_STATUS))
+
+    def wait_ready(self, timeout=300):
+        deadline = time.time() + timeout
+        while True:
+            try:
+                if self.status()["model"]["ready"]:
+                    return
+            except (OSError, RuntimeError):
+                pass
+            if time.time() > deadline:
+                raise RuntimeError(f"model server at {self.path} did not become ready")
+            time.sleep(0.5)
+
+
+class Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                op, payload = recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                if op == OP_SCORE:
+                    # One model version for the whole request, even if a swap lands meanwhile
+                    with news_utils.pin_model() as loaded:
+                        scores = news_utils.score_token_ids(decode_sequences(payload))
+                    response = encode_scores(scores, model_info(loaded))
+                elif op == OP_MODEL:
+                    response = json.dumps(model_info(news_utils.get_model())).encode("utf-8")
+                elif op == OP_STATUS:
+                    response = json.dumps(news_utils.inference_stats()).encode("utf-8")
+                else:
+                    raise ValueError(f"unknown op {op}")
+                send_frame(self.request, STATUS_OK, response)
+            except Exception as e:
+                send_frame(self.request, STATUS_ERROR, str(e).encode("utf-8"))
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=os.getenv("INSIGHTLENS_MODEL_SERVER") or "/tmp/insightlens.sock")
+    args = parser.parse_args()
+
+    # This process is the model server, not a client of one; merge every worker's requests into shared batches
+    os.environ.pop("INSIGHTLENS_MODEL_SERVER", None)
+    os.environ.setdefault("INSIGHTLENS_SCHEDULER", "1")
+    from utils import news_utils
+
+    news_utils.preload_model("blocking")
+    if not news_utils.model_status()["ready"]:
+        raise SystemExit(f"Model failed to load: {news_utils.model_status()['error']}")
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    signal.signal(signal.SIGTERM, lambda *_: exit(0))  # unwind so the socket file is removed
+    signal.signal(signal.SIGHUP, news_utils.swap_on_signal)  # hot-reload the model, keep serving
+    with Server(args.socket, Handler) as server:
+        print(f"Model server listening on {args.socket}", flush=True)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(args.socket)
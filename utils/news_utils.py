@@ -1,19 +1,298 @@
 from newspaper import Article
 from langdetect import detect
 from googletrans import Translator
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+from transformers import AutoTokenizer
+from textblob import TextBlob
 import numpy as np
 from dotenv import load_dotenv
 import os
+import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
+from utils.batch_scheduler import BatchScheduler
+from utils.backends import load_backend, quantize_model, softmax
+from utils.score_cache import ScoreCache
+from utils.model_loader import LoadedModel, weights_fingerprint
+from utils.model_registry import ModelRegistry, load_registry_file
+from utils.autotune import load_tuning, set_threads, calibrate
+from utils.executor import InferenceExecutor
+from utils.model_server import ModelClient
+from utils.shadow import ShadowEvaluator
+from utils.sampling import stratified_sample, stratified_estimate, domain_estimate
+from utils.parties import Gazetteer, GAZETTEER_FILE
+from utils.segmenter import sentence_offsets
 
 load_dotenv()
 
-# Load model and tokenizer globally (load once, fast)
-tokenizer = AutoTokenizer.from_pretrained("cardiffnlp/twitter-roberta-base-sentiment")
-model = AutoModelForSequenceClassification.from_pretrained("cardiffnlp/twitter-roberta-base-sentiment")
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment"
+CACHE_DIR = os.getenv("INSIGHTLENS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "insightlens"))
+BACKEND = os.getenv("INSIGHTLENS_BACKEND", "torch")  # "torch" or "onnx"
+QUANTIZE = os.getenv("INSIGHTLENS_QUANTIZE", "0") == "1"  # INT8 dynamic quantization (torch backend)
+COMPILE = os.getenv("INSIGHTLENS_COMPILE", "off")  # "trace", "compile" or "off" (torch backend)
+COMPILE_BUCKETS = [int(b) for b in os.getenv("INSIGHTLENS_COMPILE_BUCKETS", "32,64,128,256,512").split(",")]
+MODEL_SERVER = os.getenv("INSIGHTLENS_MODEL_SERVER", "")  # Unix socket of a `python -m utils.model_server` sidecar
+
 labels = ['Negative', 'Neutral', 'Positive']
 
+# Model registry: requests pick a model by name ("model": "fast"); a JSON file can add or override entries
+MODEL_SPECS = {
+    "accurate": {"path": MODEL_NAME, "max_length": 512, "labels": labels},
+    "fast": {"path": MODEL_NAME, "backend": "torch", "quantize": True, "max_length": 128, "labels": labels},
+}
+MODEL_REGISTRY_FILE = os.getenv("INSIGHTLENS_MODEL_REGISTRY", "")
+if MODEL_REGISTRY_FILE:
+    MODEL_SPECS = load_registry_file(MODEL_REGISTRY_FILE, MODEL_SPECS)
+DEFAULT_MODEL = os.getenv("INSIGHTLENS_MODEL", "accurate")
+MAX_LOADED_MODELS = int(os.getenv("INSIGHTLENS_MAX_LOADED_MODELS", "2"))
+OFFLINE = os.getenv("INSIGHTLENS_OFFLINE", "0") == "1"  # load models only from local directories
+
+# Short, fixed batch run before the model is reported ready
+WARMUP_SENTENCES = [
+    "The government announced a new scheme for farmers today.",
+    "Opposition leaders strongly criticised the decision.",
+    "The committee will publish its report next month after consultations with every state.",
+]
+
+def load_model(name=None, refresh=False, spec=None, local=False):
+    """
+    Load a registry spec (default: the default entry), optionally from another
+    checkpoint `name`. `refresh` rebuilds exported/traced graphs (new weights
+    under an old name); cached scores are keyed by the weights' fingerprint.
+    `local` loads the weights here even when a model server is configured.
+    """
+    spec = spec or MODEL_SPECS[DEFAULT_MODEL]
+    name = name or spec["path"]
+    backend_name = spec.get("backend", BACKEND)
+    quantize = spec.get("quantize", QUANTIZE)
+    if OFFLINE and not os.path.isdir(name):
+        raise ValueError(f"INSIGHTLENS_OFFLINE=1: {name} is not a local model directory")
+
+    tokenizer = AutoTokenizer.from_pretrained(name, local_files_only=OFFLINE)
+    options = spec_options(spec, tokenizer, quantize)
+    if model_client is not None and not local:
+        if spec is not MODEL_SPECS[DEFAULT_MODEL]:
+            raise ValueError("The model server only serves the default model")
+        # The sidecar owns the weights; this process only tokenizes
+        return LoadedModel(name, tokenizer, None, None, **options)
+    from transformers import AutoModelForSequenceClassification  # not imported by sidecar web workers
+
+    model = AutoModelForSequenceClassification.from_pretrained(name, local_files_only=OFFLINE)
+    options["fingerprint"] = weights_fingerprint(model)
+    if quantize:
+        if backend_name != "torch":
+            raise ValueError("INT8 quantization is only supported with the torch backend")
+        model = quantize_model(model)
+    backend = load_backend(backend_name, model, name, CACHE_DIR, COMPILE, tokenizer.pad_token_id, COMPILE_BUCKETS,
+                           overwrite=refresh, fingerprint=options["fingerprint"])
+    loaded = LoadedModel(name, tokenizer, model, backend, **options)
+    if spec is MODEL_SPECS[DEFAULT_MODEL]:
+        # Thread counts and BATCH_SIZE are process-wide: only the default model's calibration sets them
+        tune_model(loaded)
+    if EXECUTOR_SLOTS and "OMP_NUM_THREADS" not in os.environ:
+        # Slots run side by side, so each one gets its share of the cores
+        set_threads(EXECUTOR_THREADS or max(1, (os.cpu_count() or 1) // EXECUTOR_SLOTS), 1)
+    return loaded
+
+def tune_model(loaded):
+    """Apply the saved calibration for `loaded`; with INSIGHTLENS_AUTOTUNE, calibrate first if this host has none."""
+    if AUTOTUNE and load_tuning(TUNE_FILE, TUNE_PROFILE, loaded.name) is None:
+        # First start on this host: calibrate once, then every later start reads the file
+        calibrate(lambda sequences, batch_size: run_batches(sequences, batch_size, loaded=loaded),
+                  loaded.tokenizer, TUNE_FILE, loaded.name)
+    apply_tuning(load_tuning(TUNE_FILE, TUNE_PROFILE, loaded.name))
+
+def spec_options(spec, tokenizer, quantize):
+    """LoadedModel options for a registry spec: token limit, label order and precision."""
+    tokenizer.model_max_length = spec.get("max_length", WINDOW_TOKENS)
+    model_labels = spec.get("labels", labels)
+    return {
+        "max_length": tokenizer.model_max_length,
+        "label_order": None if model_labels == labels else [model_labels.index(label) for label in labels],
+        "precision": "int8" if quantize else "fp32",
+    }
+
+def apply_tuning(settings):
+    """Use calibrated thread counts and batch size; explicit environment settings still win."""
+    global BATCH_SIZE
+    if not settings:
+        return
+    if "OMP_NUM_THREADS" not in os.environ:
+        set_threads(settings["threads"], settings.get("interop_threads"))
+    if "INSIGHTLENS_BATCH_SIZE" not in os.environ:
+        BATCH_SIZE = settings["batch_size"]
+
+def warmup_model(loaded):
+    if model_client is not None:
+        model_client.wait_ready()
+        return
+    if hasattr(loaded.backend, "warm"):
+        loaded.backend.warm()
+    sequences = loaded.tokenizer(WARMUP_SENTENCES, truncation=True)["input_ids"]
+    run_batches(sequences, loaded=loaded)
+
+model_client = ModelClient(MODEL_SERVER) if MODEL_SERVER else None
+
+# Models and tokenizers load lazily on first use, or ahead of traffic via preload_model()
+registry = ModelRegistry(
+    MODEL_SPECS,
+    lambda name, spec: load_model(spec=spec),
+    warmup_model,
+    default=DEFAULT_MODEL,
+    max_loaded=MAX_LOADED_MODELS,
+)
+sentiment_model = registry.entry()
+
+# The model a request started on; set by pin_model() so a hot swap never changes it mid-request
+pinned_model = ContextVar("pinned_model", default=None)
+
+def get_model():
+    return pinned_model.get() or registry.get()
+
+def available_models():
+    """Registry entries this process can serve; the model-server sidecar only serves the default one."""
+    return [DEFAULT_MODEL] if model_client is not None else list(MODEL_SPECS)
+
+@contextmanager
+def pin_model(name=None):
+    """
+    Serve everything inside the block from one model version - registry entry
+    `name`, or the current/default one - even if a swap lands meanwhile.
+    """
+    loaded = registry.get(name) if name else get_model()
+    if model_client is not None:
+        loaded = sidecar_model(loaded)
+    token = pinned_model.set(loaded)
+    try:
+        yield loaded
+    finally:
+        pinned_model.reset(token)
+
+def sidecar_model(loaded):
+    """This worker's tokenizer-only model, labelled with the version and weights the sidecar serves right now."""
+    current = copy.copy(loaded)
+    info = model_client.model()
+    current.version, current.fingerprint = info["version"], info["fingerprint"]
+    return current
+
+def swap_model(name=None, entry=None, background=True):
+    """
+    Load checkpoint `name` (default: reload the current one) for registry
+    `entry` (default: the default model) in the background, warm it up and
+    switch new requests to it; in-flight requests finish on the old one.
+    With `background=False`, return once the swap has finished or failed.
+    """
+    if model_client is not None:
+        raise ValueError("This process uses the model server; swap the model there (send it SIGHUP)")
+    lazy = registry.entry(entry)
+    spec = MODEL_SPECS[entry or DEFAULT_MODEL]
+    current = lazy.get().name if lazy.ready else spec["path"]
+    name = name or current
+    lazy.swap(lambda: load_model(name, refresh=(name == current), spec=spec), background=background)
+    return lazy.status()
+
+def swap_on_signal(*_):
+    """SIGHUP handler: reload the current model. Failures (e.g. a swap already running) are logged, never raised into the server loop."""
+    try:
+        swap_model()
+    except Exception as e:
+        print(f"Model reload on SIGHUP failed: {e}", flush=True)
+
+def preload_model(mode="background"):
+    """mode: "background" (load + warm in a thread), "blocking" (wait for it) or "off"."""
+    if mode == "off":
+        return
+    sentiment_model.preload(background=(mode != "blocking"))
+
+def model_status():
+    return sentiment_model.status()
+
+# Inference executor: K slots that own the tokenizer/model they use (0 = callers use the shared model directly)
+EXECUTOR_SLOTS = int(os.getenv("INSIGHTLENS_EXECUTOR_SLOTS", "0"))
+EXECUTOR_REPLICAS = os.getenv("INSIGHTLENS_EXECUTOR_REPLICAS", "0") == "1"  # a copy of the weights per slot
+EXECUTOR_THREADS = int(os.getenv("INSIGHTLENS_EXECUTOR_THREADS", "0"))  # torch threads per slot (0 = cores // slots)
+
+def load_replica(slot, loaded):
+    """What one executor slot runs on: its own tokenizer, and its own weights with INSIGHTLENS_EXECUTOR_REPLICAS=1."""
+    tokenizer = copy.deepcopy(loaded.tokenizer)
+    options = {"max_length": loaded.max_length, "label_order": loaded.label_order, "precision": loaded.precision,
+               "fingerprint": loaded.fingerprint}
+    if not EXECUTOR_REPLICAS or loaded.model is None:
+        replica = LoadedModel(loaded.name, tokenizer, loaded.model, loaded.backend, **options)
+    else:
+        model = copy.deepcopy(loaded.model)
+        backend_name = "onnx" if loaded.backend.name == "onnx" else "torch"
+        backend = load_backend(backend_name, model, loaded.name, CACHE_DIR, COMPILE, tokenizer.pad_token_id, COMPILE_BUCKETS,
+                               fingerprint=loaded.fingerprint)
+        replica = LoadedModel(loaded.name, tokenizer, model, backend, **options)
+    replica.version = loaded.version
+    return replica
+
+executor = InferenceExecutor(load_replica, slots=EXECUTOR_SLOTS) if EXECUTOR_SLOTS > 0 else None
+
+def on_slot(fn, loaded=None):
+    """Run fn(loaded) on a free executor slot, or directly on the shared model without an executor."""
+    loaded = loaded or get_model()
+    if executor is None:
+        return fn(loaded)
+    return executor.run(fn, loaded)
+
+# Batched inference limits: sentences per forward pass and padded tokens per batch
+BATCH_SIZE = int(os.getenv("INSIGHTLENS_BATCH_SIZE", "32"))
+MAX_BATCH_TOKENS = int(os.getenv("INSIGHTLENS_MAX_BATCH_TOKENS", "8192"))
+
+# Long-document bias scoring: overlapping windows instead of truncating at 512 tokens
+WINDOW_TOKENS = 512
+WINDOW_OVERLAP = int(os.getenv("INSIGHTLENS_WINDOW_OVERLAP", "128"))
+BIAS_WEIGHTING = os.getenv("INSIGHTLENS_BIAS_WEIGHTING", "tokens")  # "tokens" or "max-abs"
+
+# Cross-request micro-batching: share forward passes between concurrent requests
+SCHEDULER_ENABLED = os.getenv("INSIGHTLENS_SCHEDULER", "0") == "1"
+SCHEDULER_MAX_BATCH = int(os.getenv("INSIGHTLENS_SCHEDULER_MAX_BATCH", "64"))
+SCHEDULER_MAX_WAIT_MS = float(os.getenv("INSIGHTLENS_SCHEDULER_MAX_WAIT_MS", "5"))
+
+# Sentence score cache: "memory" (LRU only), "disk" (LRU + SQLite) or "off"
+SENTENCE_CACHE = os.getenv("INSIGHTLENS_SENTENCE_CACHE", "memory")
+SENTENCE_CACHE_SIZE = int(os.getenv("INSIGHTLENS_SENTENCE_CACHE_SIZE", "50000"))
+SENTENCE_CACHE_DB = os.getenv("INSIGHTLENS_SENTENCE_CACHE_DB", os.path.join(CACHE_DIR, "sentence_scores.sqlite"))
+
+# Host calibration (python -m utils.autotune): which saved profile to apply, and whether to calibrate at server start
+TUNE_FILE = os.path.join(CACHE_DIR, "autotune.json")
+TUNE_PROFILE = os.getenv("INSIGHTLENS_TUNE_PROFILE", "latency")  # "latency", "throughput" or "off"
+AUTOTUNE = os.getenv("INSIGHTLENS_AUTOTUNE", "0") == "1"
+
+# Confidence cascade: a TextBlob pass settles clearly factual sentences without the transformer
+CASCADE = os.getenv("INSIGHTLENS_CASCADE", "0") == "1"
+LEXICON_MAX_SUBJECTIVITY = float(os.getenv("INSIGHTLENS_LEXICON_MAX_SUBJECTIVITY", "0.0"))
+
+# Article-level bias: "windows" (own windowed pass) or "sentences" (aggregate the sentence scores)
+BIAS_MODE = os.getenv("INSIGHTLENS_BIAS_MODE", "windows")
+SENTENCE_BIAS_WEIGHTING = os.getenv("INSIGHTLENS_SENTENCE_BIAS_WEIGHTING", "length")  # "length", "trimmed" or "subjectivity"
+SENTENCE_BIAS_TRIM = float(os.getenv("INSIGHTLENS_SENTENCE_BIAS_TRIM", "0.1"))
+# The weightings each bias mode understands (see combine_window_scores / aggregate_sentence_scores)
+BIAS_WEIGHTINGS = {"windows": ["tokens", "max-abs"], "sentences": ["length", "trimmed", "subjectivity"]}
+
+# Aspect windows: party leaning also scored on a few tokens around each mention instead of whole sentences
+ASPECTS = os.getenv("INSIGHTLENS_ASPECTS", "0") == "1"
+ASPECT_TOKENS = int(os.getenv("INSIGHTLENS_ASPECT_TOKENS", "16"))  # context tokens on each side of a mention
+ASPECT_MAX_TOKENS = int(os.getenv("INSIGHTLENS_ASPECT_MAX_TOKENS", "64"))  # nearby mentions share a window up to this size
+
+# Budgeted mode: above SAMPLE_ABOVE sentences (0 = never) only a stratified sample is scored
+SAMPLE_ABOVE = int(os.getenv("INSIGHTLENS_SAMPLE_ABOVE", "2000"))
+SAMPLE_SIZE = int(os.getenv("INSIGHTLENS_SAMPLE_SIZE", "400"))  # sentences without party mentions
+SAMPLE_MENTION_BUDGET = int(os.getenv("INSIGHTLENS_SAMPLE_MENTION_BUDGET", "400"))  # sentences with mentions
+SAMPLE_CONFIDENCE = float(os.getenv("INSIGHTLENS_SAMPLE_CONFIDENCE", "0.95"))
+SAMPLE_SEED = int(os.getenv("INSIGHTLENS_SAMPLE_SEED", "0"))
+
+# Shadow evaluation: a candidate model re-scores a fraction of live sentences in the background
+SHADOW_MODEL = os.getenv("INSIGHTLENS_SHADOW_MODEL", "")  # "" = off
+SHADOW_QUANTIZE = os.getenv("INSIGHTLENS_SHADOW_QUANTIZE", "0") == "1"
+SHADOW_FRACTION = float(os.getenv("INSIGHTLENS_SHADOW_FRACTION", "0.1"))
+SHADOW_DB = os.getenv("INSIGHTLENS_SHADOW_DB", os.path.join(CACHE_DIR, "shadow.sqlite"))
+
+# Party gazetteer: aliases and leader names in any script; edits to the file apply without a restart
+GAZETTEER_PATH = os.getenv("INSIGHTLENS_GAZETTEER") or GAZETTEER_FILE
+GAZETTEER_CHECK = float(os.getenv("INSIGHTLENS_GAZETTEER_CHECK", "2"))  # seconds between file checks
+
 def extract_article(url):
     try:
         article = Article(url)
@@ -42,94 +321,689 @@ def translate_to_english(text, src_lang):
         return f"Translation error: {str(e)}"
 
 
-def analyze_bias(text):
+def split_windows(token_ids, tokenizer, window=WINDOW_TOKENS, overlap=WINDOW_OVERLAP):
+    """
+    Cut article token ids (without special tokens) into overlapping windows.
+    Each window is wrapped with the model's special tokens and fits in `window`.
+    """
+    body = window - 2  # room for <s> ... </s>
+    step = max(body - overlap, 1)
+    starts = range(0, max(len(token_ids) - overlap, 1), step)
+    return [wrap_special_tokens(token_ids[start:start + body], tokenizer) for start in starts]
+
+def wrap_special_tokens(token_ids, tokenizer):
+    return [tokenizer.cls_token_id] + list(token_ids) + [tokenizer.sep_token_id]
+
+def combine_window_scores(scores, lengths, weighting=None):
+    """
+    Merge per-window softmax scores into one article-level score vector.
+
+    "tokens"  - mean of the windows weighted by their token count
+    "max-abs" - the window with the strongest polarity speaks for the article
+    """
+    weighting = weighting or BIAS_WEIGHTING
+    if weighting == "tokens":
+        return np.average(scores, axis=0, weights=lengths)
+    if weighting == "max-abs":
+        return scores[np.argmax(np.abs(scores[:, 2] - scores[:, 0]))]
+    raise ValueError(f"Unknown bias weighting: {weighting}")
+
+def bias_label(polarity, subjectivity):
+    # Bias label based on polarity thresholds
+    if subjectivity < 0.4:
+        return "Neutral"
+    elif polarity < -0.3:
+        return "Left-Leaning"
+    elif polarity > 0.3:
+        return "Right-Leaning"
+    return "Moderate / Center"
+
+def encode_article(text):
+    """
+    Tokenize the whole article once (fast tokenizer, no special tokens) and
+    keep the character offsets of every token. Article windows and sentence
+    batches are both cut from this encoding instead of re-tokenizing.
+    """
+    encoded = on_slot(lambda loaded: loaded.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False))
+    offsets = np.array(encoded["offset_mapping"], dtype=np.int64).reshape(-1, 2)
+    return {"input_ids": encoded["input_ids"], "starts": offsets[:, 0], "ends": offsets[:, 1]}
+
+def sentence_token_ids(text, encoding, spans, max_tokens=None):
+    """
+    Token ids of each sentence span cut from the article encoding, identical
+    to tokenizing the sentence on its own. In context a sentence's first word
+    carries the space before it (RoBERTa's "Ġ"), so the tokens up to the
+    first whitespace gap are re-tokenized standalone, in one batched call.
+    """
+    max_tokens = max_tokens or get_model().max_length - 2
+    starts, ends = encoding["starts"], encoding["ends"]
+    cuts, heads = [], []
+    for start, end in spans:
+        first = int(np.searchsorted(ends, start, side="right"))
+        last = int(np.searchsorted(starts, end, side="left"))
+        head = first
+        while head < last and (head == first or starts[head] <= ends[head - 1]):
+            head += 1
+        cuts.append((head, last))
+        heads.append(text[start:ends[head - 1]] if head > first else "")
+    head_ids = on_slot(lambda loaded: loaded.tokenizer(heads, add_special_tokens=False, verbose=False)["input_ids"])
+    return [(ids + encoding["input_ids"][head:last])[:max_tokens] for ids, (head, last) in zip(head_ids, cuts)]
+
+def analyze_bias(text, long_document=True, weighting=None, encoding=None):
     try:
-        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-        with torch.no_grad():
-            outputs = model(**inputs)
-            scores = torch.nn.functional.softmax(outputs.logits, dim=1).squeeze().numpy()
+        loaded = get_model()
+        tokenizer = loaded.tokenizer
+        encoding = encoding or encode_article(text)
+        if long_document:
+            # Score the whole article as overlapping windows in batched forward passes
+            overlap = min(WINDOW_OVERLAP, (loaded.max_length - 2) // 4)  # short-context models get shorter overlaps
+            windows = split_windows(encoding["input_ids"], tokenizer, loaded.max_length, overlap)
+        else:
+            windows = [wrap_special_tokens(encoding["input_ids"][:loaded.max_length - 2], tokenizer)]
+
+        window_scores = score_token_ids(windows, batch_size=len(windows))
+        scores = combine_window_scores(window_scores, [len(w) for w in windows], weighting)
 
         label = labels[np.argmax(scores)]
         polarity = scores[2] - scores[0]  # Positive - Negative
         subjectivity = 1.0 - scores[1]    # 1 - Neutral score
 
-        # Bias label based on polarity thresholds
-        if subjectivity < 0.4:
-            bias = "Neutral"
-        elif polarity < -0.3:
-            bias = "Left-Leaning"
-        elif polarity > 0.3:
-            bias = "Right-Leaning"
-        else:
-            bias = "Moderate / Center"
-
         return {
                 "label": label,
                 "polarity": float(round(polarity, 2)),
                 "subjectivity": float(round(subjectivity, 2)),
-                "bias": bias
+                "bias": bias_label(polarity, subjectivity),
+                "windows": len(windows)
                }
 
 
     except Exception as e:
         return {"error": f"Bias analysis failed: {str(e)}"}
 
-import re
+def make_batches(lengths, batch_size=None, max_tokens=None):
+    """
+    Group sequence indices into length-sorted batches.
 
-def sentence_tone_breakdown(text):
-    try:
-        sentences = [s.strip() for s in text.split('.') if len(s.strip()) > 5]
-        results = []
-
-        # Define party keywords
-        parties = {
-                "Bharatiya Janata Party": ["BJP", "Modi", "Hindutva","Bharatiya Janata Party"],
-                "Indian National Congress": ["Congress", "Rahul Gandhi", "UPA","Indian National Congress"],
-                "Aam Aadmi Party": ["AAP", "Arvind Kejriwal", "Anti-corruption","Aam Aadmi Party"],
-                "All India Trinamool Congress": ["TMC", "Mamata Banerjee", "Mamata Didi","All India Trinamool Congress"],
-                "Dravida Munnetra Kazhagam": ["DMK", "M.K. Stalin", "Dravidian politics"],
-                "Bahujan Samaj Party": ["BSP", "Mayawati", "Dalit"],
-                "All India Anna Dravida Munnetra Kazhagam": ["AIADMK", "Jayalalithaa", "Amma"],
-                "Samajwadi Party": ["SP", "Akhilesh Yadav", "Samajwadi Party"],
-                "Rashtriya Janata Dal": ["RJD", "Lalu Prasad","Rashtriya Janata Dal"],
-                "Nationalist Congress Party": ["NCP", "Sharad Pawar","Nationalist Congress Party"],
-                "Janata Dal (United)": ["JD(U)", "Nitish Kumar", "Coalition politics","Janata Dal (United)"],
-                "Communist Party of India (Marxist)": ["CPI(M)", "Left-wing", "Communism","Communist Party of India"],
-                "Telugu Desam Party": ["TDP", "Chandrababu Naidu", "Telugu pride"],
-                "Shiv Sena": ["Shiv Sena", "Thackeray", "Marathi pride"],
-                "National People's Party": ["NPP", "Conrad Sangma", "Regionalism","National People's Party"]
-            }
+    Sorting by length keeps padding small; a batch is closed once it holds
+    `batch_size` items or its padded size would exceed `max_tokens`.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    max_tokens = max_tokens or MAX_BATCH_TOKENS
 
-        for sentence in sentences:
-            # Transformer-based classification
-            inputs = tokenizer(sentence, return_tensors="pt", truncation=True)
-            with torch.no_grad():
-                outputs = model(**inputs)
-                scores = torch.nn.functional.softmax(outputs.logits, dim=1).squeeze().numpy()
-
-            label = labels[np.argmax(scores)]
-            polarity = scores[2] - scores[0]  # positive - negative
-            subjectivity = 1.0 - scores[1]    # inverse of neutral
-
-            # Party mention detection
-            mentions = []
-            for party, keywords in parties.items():
-                if any(re.search(rf"\b{kw}\b", sentence, re.IGNORECASE) for kw in keywords):
-                    mentions.append(party)
-
-            results.append({
-                "sentence": sentence,
-                "polarity": float(round(polarity, 2)),
-                "subjectivity": float(round(subjectivity, 2)),
-                "label": label,
-                "mentions": mentions
-            })
+    batches, current, longest = [], [], 0
+    for i in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        widest = max(longest, lengths[i])
+        if current and (len(current) >= batch_size or widest * (len(current) + 1) > max_tokens):
+            batches.append(current)
+            current, widest = [], lengths[i]
+        current.append(i)
+        longest = widest
+    if current:
+        batches.append(current)
+    return batches
+
+def run_batches(sequences, batch_size=None, max_tokens=None, loaded=None):
+    """
+    Run already-tokenized sequences through the model in padded batches.
+    Returns an (n, 3) array of softmax scores in the input order, with the
+    columns in `labels` order whatever the model's own label order is.
+    """
+    loaded = loaded or get_model()
+    scores = np.zeros((len(sequences), len(labels)), dtype=np.float32)
+    for batch in make_batches([len(seq) for seq in sequences], batch_size, max_tokens):
+        inputs = loaded.tokenizer.pad({"input_ids": [sequences[i] for i in batch]}, return_tensors="np")
+        logits = loaded.backend.predict(inputs["input_ids"].astype(np.int64), inputs["attention_mask"].astype(np.int64))
+        probabilities = softmax(logits)
+        scores[batch] = probabilities if loaded.label_order is None else probabilities[:, loaded.label_order]
+    return scores
 
-        return results
+scheduler = BatchScheduler(
+    lambda sequences, loaded: on_slot(lambda replica: run_batches(sequences, batch_size=SCHEDULER_MAX_BATCH, loaded=replica), loaded),
+    max_batch_size=SCHEDULER_MAX_BATCH,
+    max_wait_ms=SCHEDULER_MAX_WAIT_MS,
+) if SCHEDULER_ENABLED else None
 
+def score_token_ids(sequences, batch_size=None, max_tokens=None):
+    """
+    Score token id sequences, sharing batches with other in-flight requests
+    when the scheduler is enabled, or on the model-server sidecar when
+    INSIGHTLENS_MODEL_SERVER is set.
+    """
+    if not sequences:
+        return np.zeros((0, len(labels)), dtype=np.float32)
+    if model_client is not None:
+        return model_client.score(sequences)
+    if scheduler is not None:
+        return scheduler.score(sequences, get_model())
+    return on_slot(lambda loaded: run_batches(sequences, batch_size, max_tokens, loaded))
+
+def cache_id(loaded):
+    backend = loaded.backend.name if loaded.backend is not None else BACKEND
+    # The fingerprint keeps scores from old weights away from new weights reloaded under the same name
+    return f"{loaded.name}|{backend}|{loaded.precision}|{loaded.max_length}|{loaded.fingerprint}"
+
+sentence_cache = ScoreCache(
+    f"{MODEL_NAME}|{BACKEND}|{'int8' if QUANTIZE else 'fp32'}",
+    max_entries=SENTENCE_CACHE_SIZE,
+    path=SENTENCE_CACHE_DB if SENTENCE_CACHE == "disk" else None,
+) if SENTENCE_CACHE != "off" else None
+
+def inference_stats():
+    backend = sentiment_model.get().backend if sentiment_model.state in ("warming", "ready") else None
+    if model_client is not None and sentiment_model.ready:
+        return {"model": model_status(), "model_server": model_client.status(), "gazetteer": gazetteer.stats()}
+    return {
+        "model": model_status(),
+        "backend": {"name": backend.name, **(backend.status() if hasattr(backend, "status") else {})} if backend else None,
+        "scheduler": scheduler.stats() if scheduler is not None else None,
+        "executor": executor.stats() if executor is not None else None,
+        "sentence_cache": sentence_cache.stats() if sentence_cache is not None else None,
+        "registry": registry.stats(),
+        "gazetteer": gazetteer.stats(),
+    }
+
+def score_texts(texts, batch_size=None, max_tokens=None, sequences=None):
+    """
+    Score texts, reusing cached sentence scores; only cache misses are sent
+    through `score_token_ids`. Pass `sequences` (token ids aligned with
+    `texts`, from `sentence_token_ids`) to skip tokenizing the misses again;
+    they must match standalone tokenization, as the cache is keyed by text.
+    """
+    texts = list(texts)
+    scores = np.zeros((len(texts), len(labels)), dtype=np.float32)
+    if not texts:
+        return scores
+
+    loaded = get_model()
+    model_id = cache_id(loaded)
+    # A sidecar client only knows which weights it is scoring on inside pin_model()
+    cache = sentence_cache if loaded.fingerprint is not None else None
+    cached = cache.get_many(texts, model_id) if cache is not None else [None] * len(texts)
+    missing = [i for i, row in enumerate(cached) if row is None]
+    for i, row in enumerate(cached):
+        if row is not None:
+            scores[i] = row
+
+    if missing:
+        if sequences is not None:
+            tokenizer = get_model().tokenizer
+            missing_sequences = [wrap_special_tokens(sequences[i], tokenizer) for i in missing]
+        else:
+            missing_texts = [texts[i] for i in missing]
+            missing_sequences = on_slot(lambda loaded: loaded.tokenizer(missing_texts, truncation=True)["input_ids"])
+        scores[missing] = score_token_ids(missing_sequences, batch_size, max_tokens)
+        if model_client is not None and (model_client.scored_by() or {}).get("fingerprint") != loaded.fingerprint:
+            cache = None  # the sidecar swapped models mid-request: don't file new scores under the old weights
+        if cache is not None:
+            cache.put_many([texts[i] for i in missing], scores[missing], model_id)
+    return scores
+
+# Every alias of every party compiled into a single pattern, rebuilt when the gazetteer file changes
+gazetteer = Gazetteer(GAZETTEER_PATH, GAZETTEER_CHECK)
+
+def find_entities(text):
+    """
+    Party mentions found directly in `text`, in any script the gazetteer
+    covers - no translation or model involved. Keyed by short name: the
+    full party name, mention count, names matched and their (start, end) offsets.
+    """
+    matcher = gazetteer.matcher()
+    entities = {}
+    for start, end, party in matcher.find(text):
+        entity = entities.setdefault(matcher.short_names[party], {"party": party, "mentions": 0, "names": [], "offsets": []})
+        entity["mentions"] += 1
+        if text[start:end] not in entity["names"]:
+            entity["names"].append(text[start:end])
+        entity["offsets"].append([start, end])
+    return entities
+
+def lexicon_score(sentence):
+    """
+    Cheap TextBlob pass for the cascade. Returns (polarity, subjectivity) when
+    the sentence is confidently factual, otherwise None.
+    """
+    sentiment = TextBlob(sentence).sentiment
+    if sentiment.subjectivity <= LEXICON_MAX_SUBJECTIVITY:
+        return sentiment.polarity, sentiment.subjectivity
+    return None
+
+def sentence_spans(text):
+    """Character (start, end) spans of the sentences `sentence_tone_breakdown` scores."""
+    return [(start, end) for start, end in sentence_offsets(text) if end - start > 5]
+
+def lexicon_probabilities(polarity, subjectivity):
+    """
+    Express a lexicon-tier (polarity, subjectivity) pair as a
+    [negative, neutral, positive] row so it aggregates like model scores.
+    """
+    positive = max((subjectivity + polarity) / 2.0, 0.0)
+    negative = max((subjectivity - polarity) / 2.0, 0.0)
+    return [negative, 1.0 - subjectivity, positive]
+
+def should_sample(count, sample=None):
+    """None follows INSIGHTLENS_SAMPLE_ABOVE; True samples whenever the budget is smaller than the article."""
+    if sample is None:
+        return SAMPLE_ABOVE > 0 and count > SAMPLE_ABOVE
+    return bool(sample) and count > SAMPLE_SIZE + SAMPLE_MENTION_BUDGET
+
+def score_sentences(text, batch_size=None, max_tokens=None, cascade=None, encoding=None, sample=None, spans=None):
+    """
+    Split `text` into sentences, detect party mentions and score every
+    sentence. Returns the sentences, their spans, mentions, scoring tier and
+    an (n, 3) score matrix that the breakdown and aggregations are built from,
+    plus the gazetteer matcher ("parties"), every match it found in the text
+    ("found", see `PartyMatcher.find`) and the token ids cut from `encoding`
+    for transformer-tier sentences ("token_ids", None where a sentence was
+    tokenized on its own or not at all).
+
+    Long articles (see `should_sample`) are reduced to a stratified sample
+    first; "sampling" then describes the population it was drawn from.
+    `spans` skips the segmentation when the caller already has `sentence_spans(text)`.
+    """
+    spans = sentence_spans(text) if spans is None else spans
+    sentences = [text[start:end] for start, end in spans]
+
+    # Party mention detection: one pass over the whole text, with one gazetteer version for the whole request
+    matcher = gazetteer.matcher()
+    found = matcher.find(text)
+    all_mentions = matcher.mentions(text, spans, found)
+
+    sampling = None
+    if should_sample(len(sentences), sample):
+        keep, strata = stratified_sample([bool(m) for m in all_mentions], SAMPLE_SIZE, SAMPLE_MENTION_BUDGET, SAMPLE_SEED)
+        party_sentences = {}
+        for mentions in all_mentions:
+            for party in mentions:
+                party_sentences[party] = party_sentences.get(party, 0) + 1
+        sampling = {"population": len(sentences), "strata": strata, "party_sentences": party_sentences}
+        sentences = [sentences[i] for i in keep]
+        spans = [spans[i] for i in keep]
+        all_mentions = [all_mentions[i] for i in keep]
+
+    # Cascade: factual sentences without party mentions are settled by the lexicon tier
+    cascade = CASCADE if cascade is None else cascade
+    lexicon = [lexicon_score(s) if cascade and not m else None for s, m in zip(sentences, all_mentions)]
+
+    scores = np.zeros((len(sentences), len(labels)), dtype=np.float32)
+    tiers = ["transformer" if result is None else "lexicon" for result in lexicon]
+    for i, result in enumerate(lexicon):
+        if result is not None:
+            scores[i] = lexicon_probabilities(*result)
+
+    # Transformer-based classification, batched over the remaining sentences
+    transformer_idx = [i for i, result in enumerate(lexicon) if result is None]
+    token_ids = [None] * len(sentences)
+    if transformer_idx:
+        sequences = None
+        if encoding is not None:
+            sequences = sentence_token_ids(text, encoding, [spans[i] for i in transformer_idx])
+            for i, ids in zip(transformer_idx, sequences):
+                token_ids[i] = ids
+        scores[transformer_idx] = score_texts([sentences[i] for i in transformer_idx], batch_size, max_tokens, sequences)
+
+    return {"sentences": sentences, "spans": spans, "mentions": all_mentions, "tiers": tiers, "scores": scores,
+            "token_ids": token_ids, "sampling": sampling, "parties": matcher, "found": found}
+
+def tone_columns(scored):
+    """Labels, polarity and subjectivity for every sentence in one vectorized step, as parallel lists."""
+    scores = scored["scores"].astype(np.float64)
+    return {
+        "sentence": scored["sentences"],
+        "polarity": np.round(scores[:, 2] - scores[:, 0], 2).tolist(),  # positive - negative
+        "subjectivity": np.round(1.0 - scores[:, 1], 2).tolist(),       # inverse of neutral
+        "label": np.array(labels)[scores.argmax(axis=1)].tolist() if len(scores) else [],
+        "mentions": scored["mentions"],
+        "tier": scored["tiers"]
+    }
+
+def format_tone_breakdown(scored, columnar=False):
+    """One dict per sentence, or with `columnar` the parallel arrays from `tone_columns`."""
+    columns = tone_columns(scored)
+    if columnar:
+        return columns
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+def sentence_tone_breakdown(text, batch_size=None, max_tokens=None, cascade=None, encoding=None, sample=None, columnar=False):
+    try:
+        return format_tone_breakdown(score_sentences(text, batch_size, max_tokens, cascade, encoding, sample), columnar)
     except Exception as e:
         return [{"error": str(e)}]
 
+def aggregate_sentence_scores(scores, lengths, weighting=None, trim=None):
+    """
+    Collapse an (n, 3) sentence score matrix into one article-level row.
+
+    "length"       - mean weighted by sentence length
+    "trimmed"      - per-class mean after dropping the `trim` fraction at both ends
+    "subjectivity" - mean weighted by each sentence's subjectivity (1 - neutral)
+    """
+    weighting = weighting or SENTENCE_BIAS_WEIGHTING
+    trim = SENTENCE_BIAS_TRIM if trim is None else trim
+    if weighting == "length":
+        return np.average(scores, axis=0, weights=np.asarray(lengths, dtype=np.float64))
+    if weighting == "trimmed":
+        k = int(len(scores) * trim)
+        kept = np.sort(scores, axis=0)[k:len(scores) - k]
+        row = kept.mean(axis=0)
+        return row / row.sum()
+    if weighting == "subjectivity":
+        weights = 1.0 - scores[:, 1]
+        if weights.sum() <= 0:
+            return scores.mean(axis=0)
+        return np.average(scores, axis=0, weights=weights)
+    raise ValueError(f"Unknown sentence bias weighting: {weighting}")
+
+def bias_from_sentences(scored, weighting=None):
+    """Article-level bias derived from the sentence score matrix, without another forward pass."""
+    lengths = [end - start for start, end in scored["spans"]]
+    weighting = weighting or SENTENCE_BIAS_WEIGHTING
+    scores = aggregate_sentence_scores(scored["scores"].astype(np.float64), lengths, weighting)
+
+    polarity = scores[2] - scores[0]  # Positive - Negative
+    subjectivity = 1.0 - scores[1]    # 1 - Neutral score
+    return {
+        "label": labels[np.argmax(scores)],
+        "polarity": float(round(polarity, 2)),
+        "subjectivity": float(round(subjectivity, 2)),
+        "bias": bias_label(polarity, subjectivity),
+        "source": "sentences",
+        "weighting": weighting,
+        "sentences": len(scored["sentences"])
+    }
+
+def bias_from_sample(scored, confidence=None):
+    """
+    Article-level and per-party estimates, with confidence intervals, from
+    the stratified sample drawn by `score_sentences`. Parties are keyed by
+    short name, like `party_leaning`.
+    """
+    confidence = confidence or SAMPLE_CONFIDENCE
+    sampling = scored["sampling"]
+    strata = sampling["strata"]
+    scores = scored["scores"].astype(np.float64)
+    stratum = ["mentions" if m else "other" for m in scored["mentions"]]
+
+    polarity_scores = scores[:, 2] - scores[:, 0]
+    subjectivity_scores = 1.0 - scores[:, 1]
+    class_means = [stratified_estimate(scores[:, k], stratum, strata, confidence)[0] for k in range(len(labels))]
+    polarity, polarity_ci = stratified_estimate(polarity_scores, stratum, strata, confidence)
+    subjectivity, subjectivity_ci = stratified_estimate(subjectivity_scores, stratum, strata, confidence)
+
+    parties = {}
+    for party, population in sampling["party_sentences"].items():
+        sampled = [i for i, mentions in enumerate(scored["mentions"]) if party in mentions]
+        estimate = domain_estimate(polarity_scores[sampled], population, len(sampled), confidence)
+        if estimate is None:
+            continue
+        party_polarity, party_ci = estimate
+        parties[scored["parties"].short_names[party]] = {
+            "polarity": round(party_polarity, 3),
+            "polarity_ci": [round(party_ci[0], 3), round(party_ci[1], 3)] if party_ci else None,
+            "sentences": population,
+            "sampled": len(sampled)
+        }
+
+    return {
+        "label": labels[int(np.argmax(class_means))],
+        "polarity": float(round(polarity, 2)),
+        "subjectivity": float(round(subjectivity, 2)),
+        "bias": bias_label(polarity, subjectivity),
+        "source": "sample",
+        "sampled": True,
+        "sampling": {
+            "sentences": sampling["population"],
+            "scored": len(scored["sentences"]),
+            "strata": strata,
+            "confidence": confidence,
+            "polarity_ci": [round(polarity_ci[0], 3), round(polarity_ci[1], 3)],
+            "subjectivity_ci": [round(subjectivity_ci[0], 3), round(subjectivity_ci[1], 3)],
+            "parties": parties
+        }
+    }
+
+def mention_matrix(mentions, matcher):
+    """(sentences, parties) 0/1 matrix in gazetteer order; a party counts once per sentence."""
+    index = {party: i for i, party in enumerate(matcher.parties)}
+    matrix = np.zeros((len(mentions), len(index)), dtype=np.float64)
+    for row, parties in enumerate(mentions):
+        matrix[row, [index[party] for party in parties]] = 1.0
+    return matrix
+
+def party_leaning(scored):
+    """
+    Mean transformer polarity of the sentences mentioning each party, keyed
+    by short name: mention matrix times polarity vector over mention counts.
+    """
+    scores = scored["scores"].astype(np.float64)
+    matcher = scored["parties"]
+    matrix = mention_matrix(scored["mentions"], matcher)
+    counts = matrix.sum(axis=0)
+    sums = (scores[:, 2] - scores[:, 0]) @ matrix if len(scores) else counts
+    return {
+        matcher.short_names[party]: round(float(sums[i] / counts[i]), 3)
+        for i, party in enumerate(matcher.parties) if counts[i]
+    }
+
+def aspect_windows(text, matcher, context=None, max_tokens=None, encoding=None, spans=None, found=None):
+    """
+    Token windows of `context` tokens either side of every party mention,
+    kept inside the mention's sentence. A mention whose window touches the
+    previous one shares it as long as the merged window fits in `max_tokens`,
+    so every party credited to a window is inside it.
+
+    Windows are sliced from the article `encoding` when there is one;
+    otherwise only the sentences that mention a party are tokenized, so the
+    cost follows the number of mentions, not the article length. `spans` and
+    `found` (the sentence spans and `matcher.find` results) skip segmenting
+    and scanning the text again; mentions outside every span are left out.
+    Returns the windows as token ids (without special tokens) and the parties in each.
+    """
+    context = context or ASPECT_TOKENS
+    max_tokens = min(max_tokens or ASPECT_MAX_TOKENS, get_model().max_length - 2)
+    found = matcher.find(text) if found is None else found
+    if not found:
+        return [], []
+    spans = sentence_offsets(text) if spans is None else spans
+    sentence_starts = np.array([start for start, _ in spans])
+
+    by_sentence = {}
+    for start, end, party in found:
+        i = int(np.searchsorted(sentence_starts, start, side="right")) - 1
+        if i >= 0 and end <= spans[i][1]:
+            by_sentence.setdefault(i, []).append((start, end, party))
+
+    # Per sentence: token ids, absolute character offsets and the sentence's token range
+    if encoding is not None:
+        ids, starts, ends = encoding["input_ids"], encoding["starts"], encoding["ends"]
+        tokens = {
+            i: (ids, starts, ends, int(np.searchsorted(ends, spans[i][0], side="right")),
+                int(np.searchsorted(starts, spans[i][1], side="left")))
+            for i in by_sentence
+        }
+    else:
+        texts = [text[spans[i][0]:spans[i][1]] for i in by_sentence]
+        encoded = on_slot(lambda loaded: loaded.tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True, verbose=False))
+        tokens = {}
+        for i, ids, offsets in zip(by_sentence, encoded["input_ids"], encoded["offset_mapping"]):
+            offsets = np.array(offsets, dtype=np.int64).reshape(-1, 2) + spans[i][0]
+            tokens[i] = (ids, offsets[:, 0], offsets[:, 1], 0, len(ids))
+
+    windows, parties = [], []
+    for i, mentions in by_sentence.items():
+        ids, starts, ends, lo, hi = tokens[i]
+        groups = []
+        for start, end, party in mentions:
+            first = int(np.searchsorted(ends, start, side="right"))
+            last = int(np.searchsorted(starts, end, side="left"))
+            begin, finish = max(first - context, lo), min(last + context, hi)
+            if finish - begin > max_tokens:
+                begin = max(begin, min(first, finish - max_tokens))
+                finish = min(finish, max(begin + max_tokens, last))
+            # Never cut a word (or the byte-level tokens of one character) in half at the edges
+            while begin > lo and begin < first and starts[begin] <= ends[begin - 1]:
+                begin += 1
+            while finish < hi and finish > last and starts[finish] <= ends[finish - 1]:
+                finish -= 1
+            group = groups[-1] if groups else None
+            if group and begin <= group[1] and max(finish, group[1]) - group[0] <= max_tokens:
+                group[1] = max(finish, group[1])
+                group[2].add(party)
+            else:
+                groups.append([begin, finish, {party}])
+        for begin, finish, members in groups:
+            windows.append(list(ids[begin:finish]))
+            parties.append(sorted(members, key=matcher.parties.index))
+    return windows, parties
+
+def aspect_leaning(text, matcher, leaning=None, encoding=None, spans=None, found=None):
+    """
+    Per-party polarity from aspect windows, scored as one batch of short
+    sequences (identical windows once). Keyed by short name; `leaning`
+    (the sentence-level `party_leaning`) is reported next to it. `encoding`,
+    `spans` and `found` are passed on to `aspect_windows`.
+    """
+    windows, parties = aspect_windows(text, matcher, encoding=encoding, spans=spans, found=found)
+    if not windows:
+        return {}
+    tokenizer = get_model().tokenizer
+    unique = {}
+    for window in windows:
+        unique.setdefault(tuple(window), len(unique))
+    sequences = [wrap_special_tokens(list(window), tokenizer) for window in unique]
+    scores = score_token_ids(sequences, batch_size=len(sequences)).astype(np.float64)
+    rows = scores[[unique[tuple(window)] for window in windows]]
+
+    matrix = mention_matrix(parties, matcher)
+    counts = matrix.sum(axis=0)
+    sums = (rows[:, 2] - rows[:, 0]) @ matrix
+    leaning = leaning or {}
+    results = {}
+    for i, party in enumerate(matcher.parties):
+        if counts[i]:
+            short = matcher.short_names[party]
+            results[short] = {
+                "polarity": round(float(sums[i] / counts[i]), 3),
+                "sentence_polarity": leaning.get(short),
+                "windows": int(counts[i]),
+            }
+    return results
+
+def load_shadow_model():
+    """
+    The candidate: a registry entry name, or a checkpoint path with the
+    default spec's labels and token limit. Always runs on the torch backend.
+    """
+    spec = MODEL_SPECS.get(SHADOW_MODEL) or {**MODEL_SPECS[DEFAULT_MODEL], "path": SHADOW_MODEL}
+    quantize = SHADOW_QUANTIZE or spec.get("quantize", False)
+    loaded = load_model(spec={**spec, "backend": "torch", "quantize": quantize}, local=True)
+    loaded.name = loaded.version = f"{SHADOW_MODEL} (int8)" if quantize else SHADOW_MODEL
+    return loaded
+
+def shares_vocabulary(loaded, primary):
+    """
+    Whether token ids from `primary`'s tokenizer mean the same tokens to
+    `loaded`; the answer is kept on `loaded` for the primary version it was
+    last compared with.
+    """
+    if loaded.vocabulary_match is None or loaded.vocabulary_match[0] != primary.version:
+        loaded.vocabulary_match = (primary.version, loaded.tokenizer.get_vocab() == primary.tokenizer.get_vocab())
+    return loaded.vocabulary_match[1]
+
+def shadow_score(sentences, token_ids, loaded):
+    """
+    Candidate scores for the exact token ids the primary scored; sentences
+    offered without ids, or a candidate with another vocabulary, are
+    tokenized here, on the shadow thread.
+    """
+    same = shares_vocabulary(loaded, get_model())
+    own = [i for i, ids in enumerate(token_ids) if ids is None or not same]
+    fresh = loaded.tokenizer([sentences[i] for i in own], truncation=True)["input_ids"] if own else []
+    sequences = [None if ids is None or not same else wrap_special_tokens(ids[:loaded.max_length - 2], loaded.tokenizer)
+                 for ids in token_ids]
+    for i, ids in zip(own, fresh):
+        sequences[i] = ids
+    return run_batches(sequences, loaded=loaded)
+
+shadow = ShadowEvaluator(
+    load_shadow_model,
+    shadow_score,
+    SHADOW_DB,
+    fraction=SHADOW_FRACTION,
+) if SHADOW_MODEL else None
+
+def offer_to_shadow(scored):
+    """Hand transformer-scored sentences and their token ids to the shadow queue (never blocks the request)."""
+    if shadow is None:
+        return
+    rows = [i for i, tier in enumerate(scored["tiers"]) if tier == "transformer"]
+    if not rows:
+        return
+    # Sentences scored standalone have no ids here (None): the shadow thread tokenizes the few it picks
+    token_ids = [scored["token_ids"][i] for i in rows]
+    shadow.offer([scored["sentences"][i] for i in rows], scored["scores"][rows], token_ids, get_model().version)
+
+def shadow_summary():
+    return shadow.summary(labels) if shadow is not None else {"error": "Shadow evaluation is off (set INSIGHTLENS_SHADOW_MODEL)"}
+
+def check_bias_options(bias_mode=None, weighting=None):
+    """Raise ValueError for an unknown bias mode or a weighting that mode does not use."""
+    bias_mode = bias_mode or BIAS_MODE
+    if bias_mode not in BIAS_WEIGHTINGS:
+        raise ValueError(f"Unknown bias mode: {bias_mode} (expected one of {', '.join(BIAS_WEIGHTINGS)})")
+    if weighting and weighting not in BIAS_WEIGHTINGS[bias_mode]:
+        raise ValueError(f"Unknown bias weighting for {bias_mode}: {weighting} (expected one of {', '.join(BIAS_WEIGHTINGS[bias_mode])})")
+
+def analyze_article(text, cascade=None, weighting=None, bias_mode=None, sample=None, columnar=False, aspects=None):
+    """
+    Article-level bias, sentence-level tone and party leaning from a single
+    tokenizer pass. Returns (bias_analysis, tone_breakdown, political_leaning,
+    aspect_leaning): the first two like `analyze_bias` and
+    `sentence_tone_breakdown`, the third from `party_leaning` over the same
+    sentence scores. With `aspects` (default INSIGHTLENS_ASPECTS) the last is
+    `aspect_leaning`, otherwise None.
+
+    bias_mode "windows" scores the article in its own windowed pass;
+    "sentences" derives it from the sentence scores (`weighting` then picks
+    length, trimmed or subjectivity); anything else raises ValueError
+    (see `check_bias_options`). Sampled articles always use the
+    sample estimates, so their cost stays bounded by the sample budget;
+    their aspect windows come from the sampled sentences too.
+    With `columnar`, the tone breakdown is parallel arrays, not one dict per sentence.
+    """
+    check_bias_options(bias_mode, weighting)
+    bias_mode = bias_mode or BIAS_MODE
+    with pin_model():
+        try:
+            # A sampled article only tokenizes the sentences it scores, not the whole text
+            spans = sentence_spans(text)
+            encoding = None if should_sample(len(spans), sample) else encode_article(text)
+            scored = score_sentences(text, cascade=cascade, encoding=encoding, sample=sample, spans=spans)
+        except Exception as e:
+            return {"error": f"Bias analysis failed: {str(e)}"}, [{"error": str(e)}], {}, None
+        offer_to_shadow(scored)
+
+        if scored["sampling"] is not None:
+            try:
+                bias = bias_from_sample(scored)
+            except Exception as e:
+                bias = {"error": f"Bias analysis failed: {str(e)}"}
+        elif bias_mode == "sentences" and scored["sentences"]:
+            try:
+                bias = bias_from_sentences(scored, weighting)
+            except Exception as e:
+                bias = {"error": f"Bias analysis failed: {str(e)}"}
+        else:
+            bias = analyze_bias(text, weighting=weighting if bias_mode == "windows" else None, encoding=encoding)
+        leaning = party_leaning(scored)
+        aspect_results = None
+        if ASPECTS if aspects is None else aspects:
+            try:
+                aspect_results = aspect_leaning(text, scored["parties"], leaning, encoding, scored["spans"], scored["found"])
+            except Exception as e:
+                aspect_results = {"error": f"Aspect analysis failed: {str(e)}"}
+        return bias, format_tone_breakdown(scored, columnar), leaning, aspect_results
+
 from urllib.parse import urlparse
 
 def get_source_reliability_score(url):
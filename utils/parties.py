@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+# Party gazetteer: full name -> short name used in API output, party aliases and leader names, in any script
+GAZETTEER_FILE = os.path.join(os.path.dirname(__file__), "gazetteer.json")
+
+# Characters that continue a word. Python's \w misses Indic vowel signs and viramas (category M),
+# so a match must not touch anything in the Indic blocks either - except the danda and double danda.
+WORD_CHAR = r"[\w\u0900-\u0963\u0966-\u0DFF\u200C\u200D]"
+
+
+# Precomposed letters NFC never produces (e.g. the nukta letters U+0958-U+095F): decomposed sequence -> letter
+PRECOMPOSED = {
+    unicodedata.normalize("NFC", chr(code)): chr(code)
+    for code in range(0x0900, 0x0E00)
+    if unicodedata.normalize("NFC", chr(code)) != chr(code)
+}
+
+
+def spellings(alias):
+    """
+    The ways `alias` can be encoded in a text: NFC, NFD and with
+    precomposed letters that NFC decomposes (real Hindi text often uses
+    U+095C where the NFC form is U+0921 U+093C).
+    """
+    composed = unicodedata.normalize("NFC", alias)
+    precomposed = composed
+    for sequence, letter in PRECOMPOSED.items():
+        precomposed = precomposed.replace(sequence, letter)
+    return {composed, unicodedata.normalize("NFD", alias), precomposed}
+
+
+def load_gazetteer(path=GAZETTEER_FILE):
+    """Read and check a gazetteer file; raises ValueError when it is malformed."""
+    with open(path, encoding="utf-8") as f:
+        parties = json.load(f)
+    if not isinstance(parties, dict):
+        raise ValueError(f"Gazetteer {path} must map party names to entries")
+    for name, info in parties.items():
+        if not isinstance(info, dict):
+            raise ValueError(f"Gazetteer entry {name!r} must be an object")
+        names = info.get("aliases", []) + info.get("leaders", [])
+        if not names or not all(isinstance(alias, str) and alias.strip() for alias in names):
+            raise ValueError(f"Gazetteer entry {name!r} needs non-empty string aliases or leaders")
+    return parties
+
+
+def trie_pattern(words):
+    """
+    A regex alternation for `words` arranged as a prefix trie, so matching
+    cost depends on the text, not on how many words there are.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class PartyMatcher:
+    """
+    Finds every party alias and leader name in a text with one precompiled,
+    case-insensitive pattern. Matches must not touch a word character
+    (including Indic vowel signs) on either side, and the longest name at a
+    position wins ("All India Trinamool Congress" is TMC, not also Congress).
+    """
+
+    def __init__(self, parties):
+        self.parties = list(parties)
+        self.short_names = {name: info.get("short", name) for name, info in parties.items()}
+        self.alias_party = {}
+        words = set()
+        for index, (name, info) in enumerate(parties.items()):
+            for alias in info.get("aliases", []) + info.get("leaders", []):
+                self.alias_party.setdefault(self.fold(alias), index)
+                # The text is matched as it is, so every encoding of the alias goes into the pattern
+                words.update(spelling.lower() for spelling in spellings(alias))
+        self._resolved = {}  # matched spellings str.lower() does not fold to an alias (see party_index)
+        aliases = sorted(words, key=len, reverse=True)
+        self.pattern = re.compile(rf"(?<!{WORD_CHAR})(?:{trie_pattern(aliases)})(?!{WORD_CHAR})", re.IGNORECASE)
+
+    @staticmethod
+    def fold(alias):
+        return unicodedata.normalize("NFC", alias).lower()
+
+    def party_index(self, matched):
+        """
+        The party a matched string belongs to. re.IGNORECASE folds case one
+        character at a time ("MODİ" and "ſP" match "modi" and "sp") where
+        str.lower() does not, so a miss is resolved by matching the string
+        against each alias the way the pattern did. None if nothing fits.
+        """
+        index = self.alias_party.get(self.fold(matched))
+        if index is None:
+            if matched not in self._resolved:
+                composed = unicodedata.normalize("NFC", matched)
+                alias = next((alias for alias in self.alias_party if re.fullmatch(re.escape(alias), composed, re.IGNORECASE)), None)
+                if len(self._resolved) < 4096:
+                    self._resolved[matched] = self.alias_party.get(alias)
+            index = self._resolved.get(matched)
+        return index
+
+    def find(self, text):
+        """(start, end, party) for every alias occurrence, in text order."""
+        found = []
+        for match in self.pattern.finditer(text):
+            index = self.party_index(match.group())
+            if index is not None:
+                found.append((match.start(), match.end(), self.parties[index]))
+        return found
+
+    def mentions(self, text, spans, found=None):
+        """
+        The parties mentioned in each (start, end) span of `text`, from a
+        single scan of the whole text (or the `find` results in `found`).
+        Each list is in registry order.
+        """
+        if not spans:
+            return []
+        found = self.find(text) if found is None else found
+        order = {party: index for index, party in enumerate(self.parties)}
+        hits = [set() for _ in spans]
+        starts = np.array([start for start, _ in spans])
+        ends = np.array([end for _, end in spans])
+        for start, end, party in found:
+            i = int(np.searchsorted(starts, start, side="right")) - 1
+            if i >= 0 and end <= ends[i]:
+                hits[i].add(order[party])
+        return [[self.parties[index] for index in sorted(indices)] for indices in hits]
+
+
+class Gazetteer:
+    """
+    The compiled PartyMatcher for a gazetteer file, rebuilt when the file
+    changes. `matcher()` looks at the file's mtime at most every
+    `check_every` seconds; a file that fails to load keeps the previous
+    index and is reported in `stats()`. Callers keep the matcher they got
+    for the whole request, so a reload never mixes two indexes.
+    """
+
+    def __init__(self, path=GAZETTEER_FILE, check_every=2.0):
+        self.path = path
+        self.check_every = check_every
+        self._lock = threading.Lock()
+        self._matcher = None
+        self._mtime = None
+        self._checked = 0.0
+        self._loaded_at = None
+        self._reloads = 0
+        self.error = None
+
+    def matcher(self):
+        now = time.monotonic()
+        if self._matcher is None or now - self._checked >= self.check_every:
+            with self._lock:
+                if self._matcher is None or now - self._checked >= self.check_every:
+                    self._checked = now
+                    self._refresh()
+        return self._matcher
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime and self._matcher is not None:
+                return
+            matcher = PartyMatcher(load_gazetteer(self.path))
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+            if self._matcher is None:
+                raise
+            return
+        self._matcher, self._mtime = matcher, mtime
+        self._loaded_at = time.time()
+        self._reloads += 1
+        self.error = None
+
+    def stats(self):
+        matcher = self.matcher()
+        return {
+            "path": self.path,
+            "parties": len(matcher.parties),
+            "aliases": len(matcher.alias_party),
+            "loaded_at": self._loaded_at,
+            "loads": self._reloads,
+            "error": self.error,
+        }
@@ -0,0 +1,82 @@
+from statistics import NormalDist
+
+import numpy as np
+
+
+def stratified_sample(mentioned, sample_size, mention_budget, seed=0):
+    """
+    Pick the sentences to score from a long article.
+
+    Two strata: sentences that mention a party and everything else. Party
+    sentences are all kept while they fit in `mention_budget` (otherwise a
+    random `mention_budget` of them), and `sample_size` of the rest are drawn
+    at random. Returns the chosen indices in document order and, per
+    stratum, the population and sample sizes.
+    """
+    rng = np.random.default_rng(seed)
+    mentioned = np.asarray(mentioned, dtype=bool)
+    strata = {"mentions": np.flatnonzero(mentioned), "other": np.flatnonzero(~mentioned)}
+
+    chosen, sizes = [], {}
+    for name, budget in (("mentions", mention_budget), ("other", sample_size)):
+        population = strata[name]
+        if len(population) > budget:
+            population = rng.choice(population, size=budget, replace=False)
+        chosen.append(population)
+        sizes[name] = {"population": int(len(strata[name])), "sampled": int(len(population))}
+    return np.sort(np.concatenate(chosen)).astype(int), sizes
+
+
+def z_value(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def stratum_mean_and_variance(values, population):
+    """Sample mean and the variance of that mean (with finite population correction)."""
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0
+    mean = float(np.mean(values))
+    if n >= population or n < 2:
+        return mean, 0.0
+    return mean, float(np.var(values, ddof=1)) / n * (1 - n / population)
+
+
+def stratified_estimate(values, strata, sizes, confidence=0.95):
+    """
+    Population mean of `values` from a stratified sample with its confidence
+    interval. `strata` gives each sampled value's stratum name and `sizes`
+    the population/sample counts from `stratified_sample`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    strata = np.asarray(strata)
+    total = sum(size["population"] for size in sizes.values())
+    mean = variance = 0.0
+    for name, size in sizes.items():
+        if not size["population"]:
+            continue
+        share = size["population"] / total
+        stratum_mean, stratum_variance = stratum_mean_and_variance(values[strata == name], size["population"])
+        mean += share * stratum_mean
+        variance += share ** 2 * stratum_variance
+    margin = z_value(confidence) * variance ** 0.5
+    return mean, (mean - margin, mean + margin)
+
+
+def domain_estimate(values, population, sampled, confidence=0.95):
+    """
+    Mean of `values` for a sub-population (e.g. one party's sentences) that
+    lies inside a single stratum, given the domain's own `population` and
+    `sampled` size. Returns (mean, interval), with interval None when a single
+    sampled value cannot give one, or None without samples.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return None
+    mean = float(values.mean())
+    if sampled >= population:
+        return mean, (mean, mean)
+    if len(values) < 2:
+        return mean, None
+    margin = float(z_value(confidence) * (values.std(ddof=1) / len(values) ** 0.5) * (1 - sampled / population) ** 0.5)
+    return mean, (mean - margin, mean + margin)
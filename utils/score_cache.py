@@ -0,0 +1,131 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_sentence(sentence):
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", sentence)).strip()
+
+
+class ScoreCache:
+    """
+    Content-addressed cache of per-sentence softmax scores.
+
+    Keys are a SHA-256 of the model identity and the normalized sentence, so
+    switching model, backend or quantization never serves stale scores. A
+    bounded LRU dict sits in front of an optional SQLite table (WAL mode)
+    that survives restarts; disk hits are promoted back into memory.
+    Lookups may pass their own `model_id` when several models share a cache.
+    """
+
+    def __init__(self, model_id, max_entries=50000, path=None):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.path = path
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "writes": 0}
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._connect()
+            # SQLite connections must not cross fork(): each pre-forked worker opens its own
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sentence_scores (key TEXT PRIMARY KEY, scores BLOB NOT NULL)")
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._connect()
+
+    def key(self, sentence, model_id=None):
+        payload = f"{model_id or self.model_id}\0{normalize_sentence(sentence)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, sentences, model_id=None):
+        """Return cached score rows (or None for misses) in the order of `sentences`."""
+        keys = [self.key(s, model_id) for s in sentences]
+        found = [None] * len(keys)
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                row = self._memory.get(key)
+                if row is not None:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    found[i] = row
+                else:
+                    missing.append(i)
+
+            if self._db is not None and missing:
+                rows = self._select(list({keys[i] for i in missing}))
+                still_missing = []
+                for i in missing:
+                    blob = rows.get(keys[i])
+                    if blob is None:
+                        still_missing.append(i)
+                        continue
+                    found[i] = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(keys[i], found[i])
+                    self._counters["disk_hits"] += 1
+                missing = still_missing
+
+            self._counters["misses"] += len(missing)
+        return found
+
+    def put_many(self, sentences, scores, model_id=None):
+        entries = [(self.key(s, model_id), np.asarray(row, dtype=np.float32)) for s, row in zip(sentences, scores)]
+        with self._lock:
+            for key, row in entries:
+                self._remember(key, row)
+            self._counters["writes"] += len(entries)
+            if self._db is not None and entries:
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO sentence_scores (key, scores) VALUES (?, ?)",
+                    [(key, row.tobytes()) for key, row in entries],
+                )
+                self._db.execute("COMMIT")
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = lookups - self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_path": self.path,
+            }
+
+    def _select(self, keys, chunk=500):
+        # Stay under SQLite's bound-parameter limit on very long articles
+        rows = {}
+        for start in range(0, len(keys), chunk):
+            part = keys[start:start + chunk]
+            placeholders = ",".join("?" * len(part))
+            rows.update(self._db.execute(
+                f"SELECT key, scores FROM sentence_scores WHERE key IN ({placeholders})", part
+            ).fetchall())
+        return rows
+
+    def _remember(self, key, row):
+        self._memory[key] = row
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
@@ -0,0 +1,55 @@
+import re
+
+# Words that end in a full stop without ending the sentence (compared lower-case, without the final ".")
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "shri", "smt", "sri", "hon", "rev",
+    "gen", "lt", "col", "maj", "capt", "cmdr", "sgt", "gov", "govt", "sen", "rep", "pres", "supt", "insp",
+    "rs", "inr", "vol", "fig", "approx", "vs", "etc", "viz", "cf", "e.g", "i.e", "a.m", "p.m",
+    "inc", "ltd", "co", "corp", "pvt", "bros", "dept", "univ", "assn", "ave", "rd", "km", "kg",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
+
+# A run of terminators, any closing quotes or brackets, then whitespace or the end; or a blank line
+BOUNDARY = re.compile(r"""(?P<stop>[.!?।॥]+)["'”’»)\]]*(?=\s|$)|\n[ \t]*\n""")
+# Initials such as "K." or "M.K." and single letters
+INITIALS = re.compile(r"(?:[^\W\d_]\.)*[^\W\d_]")
+# What may come before the first letter of a sentence
+OPENERS = "\"'“‘«(["
+
+
+def is_boundary(text, match):
+    """Whether a BOUNDARY match really ends a sentence."""
+    stop = match.group("stop")
+    if stop is None or stop[-1] != ".":
+        return True  # blank lines, "!", "?" and the danda always end a sentence
+
+    if not stop.endswith(".."):
+        start = match.start()
+        lo = max(start - 32, 0)  # longer words are no abbreviation; don't search the whole text
+        word_start = max(text.rfind(" ", lo, start), text.rfind("\n", lo, start), text.rfind("\t", lo, start), lo - 1) + 1
+        word = text[word_start:start].lstrip(OPENERS)
+        if word.lower() in ABBREVIATIONS or INITIALS.fullmatch(word):
+            return False
+
+    # "4.5" never gets here; a full stop or "..." followed by a digit or a lower-case word continues the sentence
+    following = text[match.end():match.end() + 40].lstrip().lstrip(OPENERS)
+    return not following or not (following[0].isdigit() or following[0].islower())
+
+
+def sentence_offsets(text):
+    """Character (start, end) offsets of the sentences in `text`, whitespace trimmed, empty ones dropped."""
+    spans, start = [], 0
+    for match in BOUNDARY.finditer(text):
+        if is_boundary(text, match):
+            spans.append((start, match.end()))
+            start = match.end()
+    spans.append((start, len(text)))
+
+    trimmed = []
+    for begin, finish in spans:
+        piece = text[begin:finish]
+        stripped = piece.strip()
+        if stripped:
+            offset = begin + len(piece) - len(piece.lstrip())
+            trimmed.append((offset, offset + len(stripped)))
+    return trimmed
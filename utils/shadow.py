@@ -0,0 +1,162 @@
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+class ShadowEvaluator:
+    """
+    Scores a sample of live sentences with a candidate model, off the request path.
+
+    `offer()` keeps each sentence with probability `fraction` and drops it
+    into a bounded queue without ever blocking; when the queue is full the
+    sentence is counted as dropped. A low-priority daemon thread loads the
+    candidate on first use (`load_candidate()` returns a LoadedModel), scores
+    queued sentences in batches with `score(sentences, token_ids, loaded)` -
+    the token ids being the ones the primary scored - and records
+    agreement, polarity deltas and per-sentence latency in SQLite.
+    """
+
+    def __init__(self, load_candidate, score, path, fraction=0.1, max_queue=1000, batch_size=32):
+        self.load_candidate = load_candidate
+        self.score = score
+        self.path = path
+        self.fraction = fraction
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+
+        self.candidate = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._start()
+        # Threads and SQLite connections do not survive fork(): each worker starts its own
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._counters = {"offered": 0, "queued": 0, "dropped": 0, "scored": 0, "errors": 0}
+        self.error = None
+
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS shadow_results (
+                created REAL NOT NULL,
+                primary_model TEXT NOT NULL,
+                candidate_model TEXT NOT NULL,
+                sentence TEXT NOT NULL,
+                primary_label INTEGER NOT NULL,
+                candidate_label INTEGER NOT NULL,
+                primary_polarity REAL NOT NULL,
+                candidate_polarity REAL NOT NULL,
+                latency_ms REAL NOT NULL
+            )
+        """)
+
+        self._worker = threading.Thread(target=self._loop, name="insightlens-shadow", daemon=True)
+        self._worker.start()
+
+    def offer(self, sentences, scores, token_ids, primary_model):
+        """
+        Queue a random `fraction` of (sentence, primary score row, primary token
+        ids) triples; never waits. Ids may be None: `score` tokenizes those.
+        """
+        picked = [i for i in range(len(sentences)) if random.random() < self.fraction]
+        queued = 0
+        for i in picked:
+            try:
+                self._queue.put_nowait((sentences[i], np.asarray(scores[i], dtype=np.float32), token_ids[i], primary_model))
+                queued += 1
+            except queue.Full:
+                break
+        with self._lock:
+            self._counters["offered"] += len(sentences)
+            self._counters["queued"] += queued
+            self._counters["dropped"] += len(picked) - queued
+
+    def _loop(self):
+        try:
+            # Linux schedules threads individually: keep the shadow out of the request threads' way
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._evaluate(items)
+            except Exception as e:
+                with self._lock:
+                    self._counters["errors"] += len(items)
+                self.error = str(e)
+
+    def _evaluate(self, items):
+        if self.candidate is None:
+            self.candidate = self.load_candidate()
+
+        sentences = [item[0] for item in items]
+        start = time.perf_counter()
+        candidate_scores = self.score(sentences, [item[2] for item in items], self.candidate)
+        latency_ms = (time.perf_counter() - start) * 1000 / len(items)
+
+        primary_scores = np.stack([item[1] for item in items])
+        primary_polarity = primary_scores[:, 2] - primary_scores[:, 0]
+        candidate_polarity = candidate_scores[:, 2] - candidate_scores[:, 0]
+        now = time.time()
+        rows = [
+            (now, items[i][3], self.candidate.name, sentences[i],
+             int(np.argmax(primary_scores[i])), int(np.argmax(candidate_scores[i])),
+             float(primary_polarity[i]), float(candidate_polarity[i]), latency_ms)
+            for i in range(len(items))
+        ]
+        self._db.execute("BEGIN")
+        self._db.executemany("INSERT INTO shadow_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._db.execute("COMMIT")
+        with self._lock:
+            self._counters["scored"] += len(items)
+
+    def summary(self, labels=("Negative", "Neutral", "Positive")):
+        """Agreement, polarity deltas and latency per candidate model, read back from the store."""
+        reader = sqlite3.connect(self.path)
+        try:
+            candidates = {}
+            for (candidate,) in reader.execute("SELECT DISTINCT candidate_model FROM shadow_results"):
+                rows = np.array(reader.execute(
+                    "SELECT primary_label, candidate_label, candidate_polarity - primary_polarity, latency_ms "
+                    "FROM shadow_results WHERE candidate_model = ?", (candidate,)
+                ).fetchall(), dtype=np.float64)
+                agree = rows[:, 0] == rows[:, 1]
+                confusion = {}
+                for primary_label, candidate_label in rows[:, :2].astype(int):
+                    key = f"{labels[primary_label]}->{labels[candidate_label]}"
+                    confusion[key] = confusion.get(key, 0) + 1
+                candidates[candidate] = {
+                    "sentences": len(rows),
+                    "agreement": round(float(agree.mean()), 4),
+                    "polarity_delta_mean": round(float(rows[:, 2].mean()), 4),
+                    "polarity_delta_abs_mean": round(float(np.abs(rows[:, 2]).mean()), 4),
+                    "polarity_delta_abs_p95": round(float(np.percentile(np.abs(rows[:, 2]), 95)), 4),
+                    "latency_ms_p50": round(float(np.percentile(rows[:, 3], 50)), 3),
+                    "latency_ms_p95": round(float(np.percentile(rows[:, 3], 95)), 3),
+                    "label_changes": confusion,
+                }
+        finally:
+            reader.close()
+
+        with self._lock:
+            return {
+                **self._counters,
+                "queue_depth": self._queue.qsize(),
+                "fraction": self.fraction,
+                "error": self.error,
+                "candidates": candidates,
+            }